@@ -1,47 +1,48 @@
+import time
+
+_script_run_started = time.perf_counter()  # Per-rerun overhead, shown when HIREBOT_PROFILE is set
+
 import streamlit as st
-import google.generativeai as genai
 from dotenv import load_dotenv
 import os
 import re
-import json
-import nltk
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
+import threading
 import streamlit.components.v1 as components
 from streamlit_lottie import st_lottie
-import requests  # For fetching Lottie animation
-
-# Download VADER lexicon for sentiment analysis (run once)
-try:
-    nltk.data.find('sentiment/vader_lexicon')
-except LookupError:
-    nltk.download('vader_lexicon', quiet=True)
-
-# Initialize VADER sentiment analyzer
-analyzer = SentimentIntensityAnalyzer()
+from gemini_client import get_model
+from sentiment import get_sentiment_analyzer
+from asset_cache import get_lottie_animation
+from interview_session import InterviewSession, extract_tech_stack, validate_desired_position
+from session_store import get_session_store
+from resume_ingest import RESUME_MAX_BYTES, merge_tech_stacks
 
 # --- Configuration and Initialization ---
 
 load_dotenv()
 
-try:
-    gemini_api_key = os.getenv("GOOGLE_API_KEY")
-    if not gemini_api_key:
-        st.error("Google API Key not found. Please set GOOGLE_API_KEY in your .env file.")
-        st.stop()
-    genai.configure(api_key=gemini_api_key)
-except Exception as e:
-    st.error(f"Error configuring Gemini API: {e}")
+if not os.getenv("GOOGLE_API_KEY"):
+    st.error("Google API Key not found. Please set GOOGLE_API_KEY in your .env file.")
     st.stop()
 
-model = genai.GenerativeModel('gemini-2.0-flash')
 
+def warm_up_resources():
+    try:
+        get_sentiment_analyzer()
+        get_model()
+    except Exception as e:
+        print(f"Error warming up resources: {e}")
+
+
+@st.cache_resource
+def start_resource_warmup():
+    # The VADER analyzer and Gemini client are lazy process-wide singletons; build them once, off the
+    # script thread, so neither first paint nor any rerun waits on NLTK or the Gemini SDK import.
+    warmup_thread = threading.Thread(target=warm_up_resources, name="resource-warmup", daemon=True)
+    warmup_thread.start()
+    return warmup_thread
 
-# --- Helper to load Lottie animation ---
-def load_lottieurl(url: str):
-    r = requests.get(url)
-    if r.status_code != 200:
-        return None
-    return r.json()
+
+start_resource_warmup()
 
 
 # --- Custom CSS for UI Enhancements ---
@@ -321,41 +322,39 @@ st.markdown(
 
 # --- Session State Management (Crucial for Streamlit) ---
 
-if "messages" not in st.session_state:
-    st.session_state.messages = []
-
-if "candidate_info" not in st.session_state:
-    st.session_state.candidate_info = {
-        "full_name": None,
-        "email": None,
-        "phone_number": None,
-        "country_code": None,
-        "years_experience": None,
-        "desired_positions": None,
-        "current_location": None,
-        "tech_stack": [],
-        "technical_questions_generated": [],
-        "current_question_index": 0,
-        "technical_Youtubes": {},
-        "technical_answer_ai_detection": {},
-        "technical_answer_sentiment": {},
-        "tech_stack_to_question": {},
-        "preferred_language": "English",
-        "resume_uploaded": False,  # New: Track resume upload status
-        "linkedin_profile": None,  # New: LinkedIn profile
-        "current_company": None  # New: Current company
-    }
+RECORD_SESSION_TIMELINE = bool(os.getenv("HIREBOT_SESSION_TIMELINE"))  # Per-session model call log, in the sidebar
 
-if "page" not in st.session_state:
-    st.session_state.page = "welcome"  # Controls which page is displayed
 
-if "conversation_stage" not in st.session_state:
-    st.session_state.conversation_stage = "greeting"  # Used within chatbot_interface for flow control
+def new_interview():
+    # Persisted to the session store as it goes, so a restart or dropped connection can resume it
+    st.session_state.pop("chat_visible_messages", None)  # Back to the default chat window
+    return InterviewSession(record_timeline=RECORD_SESSION_TIMELINE, store=get_session_store())
 
-if "awaiting_elaboration" not in st.session_state:
-    st.session_state.awaiting_elaboration = False
-if "last_question_for_elaboration" not in st.session_state:
-    st.session_state.last_question_for_elaboration = None
+
+def resume_interview(token):
+    # The interview behind a ?session=<token> link, with the page it had reached; None if there isn't one
+    store = get_session_store()
+    session = InterviewSession.resume(token, store, record_timeline=RECORD_SESSION_TIMELINE) \
+        if token and store else None
+    if session is None:
+        return None, None
+    if session.has_hiring_report() or session.stage == "conclude_interview":
+        return session, "exit_page"
+    if session.stage == "greeting":
+        return session, "candidate_info_collection"
+    return session, "chatbot_interface"
+
+
+if "interview" not in st.session_state:
+    # Candidate info, chat history and interview stage
+    st.session_state.interview, resumed_page = resume_interview(st.query_params.get("session"))
+    if st.session_state.interview is None:
+        st.session_state.interview = new_interview()
+    elif "page" not in st.session_state:
+        st.session_state.page = resumed_page
+
+if "page" not in st.session_state:
+    st.session_state.page = "welcome"  # Controls which page is displayed
 
 COUNTRY_CODES = [
     "+1 (USA/Canada)", "+44 (UK)", "+91 (India)", "+61 (Australia)",
@@ -363,6 +362,10 @@ COUNTRY_CODES = [
     "+55 (Brazil)", "+7 (Russia)", "+27 (South Africa)", "+34 (Spain)"
 ]
 
+ANSWER_INSIGHTS_REFRESH_SECONDS = 2
+RESUME_STATUS_REFRESH_SECONDS = 1
+CHAT_WINDOW_MESSAGES = 30  # Messages rendered initially and added per "Show earlier messages" click
+
 
 # --- Helper function to generate the custom interview panel HTML ---
 def get_interview_panel_html(status_text, stage_text, status_class):
@@ -440,51 +443,7 @@ def get_interview_panel_html(status_text, stage_text, status_class):
     """
 
 
-# --- Chatbot Logic (modified to accept preferred language) ---
-
-def get_gemini_response(prompt_or_history, is_history=True, generation_config=None, response_schema=None,
-                        preferred_language="English"):
-    language_instruction = f"Respond concisely and professionally, in {preferred_language}. "
-
-    if is_history:
-        formatted_history = [{"role": m["role"], "parts": [m["content"]]} for m in prompt_or_history]
-        if formatted_history and formatted_history[-1]["role"] == "user":
-            formatted_history[-1]["parts"][0] = language_instruction + formatted_history[-1]["parts"][0]
-        else:
-            formatted_history.append({"role": "user", "parts": [language_instruction]})
-    else:
-        formatted_history = [{"role": "user", "parts": [language_instruction + prompt_or_history]}]
-
-    payload = {"contents": formatted_history}
-    if response_schema:
-        payload["generationConfig"] = {"responseMimeType": "application/json", "responseSchema": response_schema}
-    if generation_config:
-        if "generationConfig" in payload:
-            payload["generationConfig"].update(generation_config)
-        else:
-            payload["generationConfig"] = generation_config
-
-    try:
-        response = model.generate_content(formatted_history, generation_config=payload.get("generationConfig"))
-
-        if response.candidates:
-            text_content = response.candidates[0].content.parts[0].text
-            if response_schema:
-                try:
-                    return json.loads(text_content)
-                except json.JSONDecodeError:
-                    print(f"Warning: Expected JSON, but received non-JSON: {text_content}")
-                    return text_content
-            return text_content
-        else:
-            print(f"No candidates found in response: {response}")
-            return "I apologize, I couldn't generate a response. Please try again."
-    except Exception as e:
-        print(f"Error calling Gemini API: {e}")
-        return f"An error occurred while processing. Please try again. (Error: {e})"
-
-
-# --- Helper Functions for Validation and Sentiment Analysis ---
+# --- Helper Functions for Validation ---
 
 def is_valid_email(email):
     return re.match(r"[^@]+@[^@]+\.[^@]+", email)
@@ -502,20 +461,67 @@ def is_valid_years_experience(years):
         return False
 
 
-def analyze_sentiment(text):
-    scores = analyzer.polarity_scores(text)
-    if scores['compound'] >= 0.05:
-        return "Positive 😊"
-    elif scores['compound'] <= -0.05:
-        return "Negative 😞"
+# --- Answer Insights ---
+
+def render_answer_insights():
+    session = st.session_state.interview
+    session.collect_answer_evaluations()
+    st.subheader("Answer Insights")
+    st.markdown("---")
+    if session.candidate_info["technical_Youtubes"]:
+        for q_text, answer in session.candidate_info["technical_Youtubes"].items():
+            if q_text in session.pending_evaluations:
+                ai_detect = sentiment = "Evaluating..."
+            else:
+                ai_detect = session.candidate_info["technical_answer_ai_detection"].get(q_text, 'N/A')
+                sentiment = session.candidate_info["technical_answer_sentiment"].get(q_text, 'N/A')
+
+            # Truncate question for display if too long
+            display_q = q_text.split(' - ')[-1]  # Get just the question part
+            if len(display_q) > 50:
+                display_q = display_q[:50] + "..."
+
+            st.markdown(f"*Q:* {display_q}")
+            st.markdown(f"*AI Detection:* {ai_detect}, *Sentiment:* {sentiment}")
+            st.markdown("---")
     else:
-        return "Neutral 😐"
+        st.markdown("No answer insights available yet.")
+
+
+# --- Resume Upload ---
+
+def render_resume_upload():
+    # Outside the info form, so parsing starts as soon as a file is picked instead of on submit
+    session = st.session_state.interview
+    uploader_generation = st.session_state.get("resume_uploader_generation", 0)
+    uploaded_resume = st.file_uploader("Upload Resume", type=["pdf", "docx"],
+                                       help=f"PDF or DOCX, up to {RESUME_MAX_BYTES // (1024 * 1024)} MB. "
+                                            "We'll add the technologies we find on it to your tech stack.",
+                                       key=f"resume_uploader_{uploader_generation}")
+    if uploaded_resume is not None:
+        session.start_resume_ingestion(uploaded_resume.getvalue(), uploaded_resume.name)
+        # A fresh uploader key drops the file's bytes from widget state; the session keeps what it needs
+        st.session_state.resume_uploader_generation = uploader_generation + 1
+        st.rerun()  # Full rerun, so this panel polls while the resume is read
+
+    info = session.candidate_info
+    was_reading = session.resume_ingestion is not None
+    if session.collect_resume_ingestion():
+        st.info("Reading your resume...")
+        return
+    if was_reading:
+        st.rerun()  # Finished: a full rerun stops the polling
+    if session.resume_error:
+        st.warning(session.resume_error)
+    elif info["resume_uploaded"]:
+        found = f" Technologies found: {', '.join(info['resume_techs'])}." if info["resume_techs"] else ""
+        st.success(f"Resume uploaded: {info['resume_file_name'] or 'your file'}.{found}")
 
 
 # --- Page Rendering Functions ---
 
 def welcome_page():
-    lottie_robot = load_lottieurl("https://lottie.host/80e90924-f7b6-455b-b997-3d906151f158/xV2xM95m0S.json")
+    lottie_robot = get_lottie_animation("robot")  # Cached/bundled copy; waits on the CDN only on a cold start
 
     st.markdown("<div class='welcome-container'>", unsafe_allow_html=True)
     st.markdown("<h1>TalentScout – Your Virtual Hiring Assistant</h1>", unsafe_allow_html=True)
@@ -526,17 +532,8 @@ def welcome_page():
 
     if st.button("🚀 Start Application", key="start_application_button"):
         st.session_state.page = "candidate_info_collection"
-        # Reset info for new application
-        st.session_state.candidate_info = {
-            "full_name": None, "email": None, "phone_number": None, "country_code": None,
-            "years_experience": None, "desired_positions": None, "current_location": None,
-            "tech_stack": [], "technical_questions_generated": [], "current_question_index": 0,
-            "technical_Youtubes": {}, "technical_answer_ai_detection": {},
-            "technical_answer_sentiment": {}, "tech_stack_to_question": {}, "preferred_language": "English",
-            "resume_uploaded": False, "linkedin_profile": None, "current_company": None
-        }
-        st.session_state.messages = []  # Clear messages for new conversation
-        st.session_state.conversation_stage = "greeting"  # Reset stage for new conversation
+        # Fresh candidate info, chat and stage
+        st.session_state.interview = new_interview()
         st.rerun()
     st.markdown("</div>", unsafe_allow_html=True)
 
@@ -553,14 +550,18 @@ def candidate_info_collection_page():
     st.markdown("<div class='candidate-form-container'>", unsafe_allow_html=True)
     st.subheader("Let’s get to know you")
 
+    # Resume (parsed in the background; polls for the result while it's being read)
+    resume_refresh = RESUME_STATUS_REFRESH_SECONDS if st.session_state.interview.resume_ingestion else None
+    st.fragment(run_every=resume_refresh)(render_resume_upload)()
+
     # Use a form for input collection
     with st.form("candidate_info_form"):
         col1, col2 = st.columns(2)
 
         with col1:
-            full_name = st.text_input("Full Name", value=st.session_state.candidate_info["full_name"] or "",
+            full_name = st.text_input("Full Name", value=st.session_state.interview.candidate_info["full_name"] or "",
                                       key="full_name_input")
-            email = st.text_input("Email Address", value=st.session_state.candidate_info["email"] or "",
+            email = st.text_input("Email Address", value=st.session_state.interview.candidate_info["email"] or "",
                                   key="email_input")
 
             # Phone Number with Country Code Selectbox
@@ -568,9 +569,9 @@ def candidate_info_collection_page():
             with phone_col1:
                 # Find the index of the current country code, default to 0 if not found
                 current_country_code_index = 0
-                if st.session_state.candidate_info["country_code"] in COUNTRY_CODES:
+                if st.session_state.interview.candidate_info["country_code"] in COUNTRY_CODES:
                     current_country_code_index = COUNTRY_CODES.index(
-                        st.session_state.candidate_info["country_code"]) + 1  # +1 because of "" option
+                        st.session_state.interview.candidate_info["country_code"]) + 1  # +1 because of "" option
 
                 selected_country_code = st.selectbox(
                     "Country Code",
@@ -581,47 +582,38 @@ def candidate_info_collection_page():
             with phone_col2:
                 # Extract digits-only part of phone number if present
                 current_phone_number_digits = ""
-                if st.session_state.candidate_info["phone_number"] and " " in st.session_state.candidate_info[
+                if st.session_state.interview.candidate_info["phone_number"] and " " in st.session_state.interview.candidate_info[
                     "phone_number"]:
-                    current_phone_number_digits = st.session_state.candidate_info["phone_number"].split(" ")[-1]
-                elif st.session_state.candidate_info["phone_number"]:  # If no space, assume it's just digits
-                    current_phone_number_digits = st.session_state.candidate_info["phone_number"]
+                    current_phone_number_digits = st.session_state.interview.candidate_info["phone_number"].split(" ")[-1]
+                elif st.session_state.interview.candidate_info["phone_number"]:  # If no space, assume it's just digits
+                    current_phone_number_digits = st.session_state.interview.candidate_info["phone_number"]
 
                 phone_number = st.text_input("Phone Number (digits only)", value=current_phone_number_digits,
                                              key="phone_number_input")
 
             years_experience = st.number_input("Years of Experience", min_value=0, max_value=50,
-                                               value=st.session_state.candidate_info["years_experience"] if
-                                               st.session_state.candidate_info["years_experience"] is not None else 0,
+                                               value=st.session_state.interview.candidate_info["years_experience"] if
+                                               st.session_state.interview.candidate_info["years_experience"] is not None else 0,
                                                key="years_experience_input")
 
         with col2:
             current_company = st.text_input("Current Company (Type 'N/A' if fresher)",
-                                            value=st.session_state.candidate_info["current_company"] or "",
+                                            value=st.session_state.interview.candidate_info["current_company"] or "",
                                             key="current_company_input")
             desired_positions = st.text_input("Desired Position(s)",
-                                              value=st.session_state.candidate_info["desired_positions"] or "",
+                                              value=st.session_state.interview.candidate_info["desired_positions"] or "",
                                               help="e.g., Software Engineer, Data Scientist",
                                               key="desired_positions_input")
             current_location = st.text_input("Current Location (City, Country)",
-                                             value=st.session_state.candidate_info["current_location"] or "",
+                                             value=st.session_state.interview.candidate_info["current_location"] or "",
                                              key="current_location_input")
             tech_stack_input = st.text_input("Primary Tech Stack (comma-separated)",
-                                             value=", ".join(st.session_state.candidate_info["tech_stack"]) or "",
+                                             value=", ".join(st.session_state.interview.candidate_info["tech_stack"]) or "",
                                              help="e.g., Python, React, AWS", key="tech_stack_input")
             linkedin_profile = st.text_input("LinkedIn Profile URL (Optional)",
-                                             value=st.session_state.candidate_info["linkedin_profile"] or "",
+                                             value=st.session_state.interview.candidate_info["linkedin_profile"] or "",
                                              key="linkedin_profile_input")
 
-            # Resume Upload placeholder
-            uploaded_resume = st.file_uploader("Upload Resume", type=["pdf", "docx"], key="resume_uploader")
-            if uploaded_resume:
-                st.session_state.candidate_info["resume_uploaded"] = True
-                st.info("Resume uploaded successfully! (Note: Actual resume parsing is not implemented in this demo.)")
-            # If a resume was previously uploaded but no new file is selected, maintain the uploaded status
-            elif st.session_state.candidate_info["resume_uploaded"]:
-                st.success("Resume previously uploaded.")
-
         st.markdown("---")  # Separator before buttons
         submit_button = st.form_submit_button("Continue to Smart Screening →")
 
@@ -643,103 +635,171 @@ def candidate_info_collection_page():
             if years_experience is None or years_experience < 0:
                 st.error("Please enter a valid number of years of experience.")
                 validation_passed = False
+
+            # Independent LLM checks run concurrently; unchanged inputs are served from the per-session memo
+            llm_checks = {}
+            if desired_positions:
+                llm_checks["desired_positions"] = (validate_desired_position, desired_positions)
+            if tech_stack_input:
+                llm_checks["tech_stack_input"] = (extract_tech_stack, tech_stack_input)
+            llm_results = st.session_state.interview.run_form_llm_checks(llm_checks)
+
+            if any(result is None for result in llm_results.values()):
+                st.error("We couldn't check your details right now. Please submit the form again in a moment.")
+                validation_passed = False
+
             if not desired_positions:
                 st.error("Please enter your desired position(s).")
                 validation_passed = False
-            else:  # Validate desired positions with LLM
-                validation_prompt_position = f"""
-                You are an AI assistant tasked with validating user input for the "Desired Position" field.
-                Given the user's input, determine if it appears to be a reasonable and relevant job title or type of position.
-                Respond only with "Valid" if the input is reasonable, or "Invalid" if it seems irrelevant, nonsensical, or clearly not a valid job title.
-                Respond in {st.session_state.candidate_info["preferred_language"]}.
-                Input: "{desired_positions}"
-                Output:
-                """
-                validation_result_position = get_gemini_response(validation_prompt_position, is_history=False,
-                                                                 preferred_language=st.session_state.candidate_info[
-                                                                     "preferred_language"]).strip()
-                if validation_result_position == "Invalid":
-                    st.error(
-                        "Please enter a valid desired job title or type of position (e.g., 'Software Engineer', 'Data Scientist').")
-                    validation_passed = False
+            elif llm_results["desired_positions"] is False:
+                st.error(
+                    "Please enter a valid desired job title or type of position (e.g., 'Software Engineer', 'Data Scientist').")
+                validation_passed = False
 
             if not current_location:
                 st.error("Please enter your current location.")
                 validation_passed = False
 
-            # Validate tech stack with LLM
-            parsed_tech_stack = []
-            if tech_stack_input:
-                tech_stack_prompt = f"""
-                You are an expert AI assistant tasked with identifying and extracting all distinct technologies from a given text.
-                A technology can be a programming language, framework, library, database, tool, or a specific concept/domain within tech.
-                Parse the following text and return a *comma-separated list of ONLY the identified technologies*.
-                Ensure that if a technology is mentioned, it is included. Do not include any conversational filler or extra sentences.
-                If no clear technologies are identified, respond with 'None'.
-                Respond in {st.session_state.candidate_info["preferred_language"]}.
-                Text: {tech_stack_input.strip()}
-                """
-                parsed_tech_stack_raw = get_gemini_response(tech_stack_prompt, is_history=False,
-                                                            preferred_language=st.session_state.candidate_info[
-                                                                "preferred_language"]).strip()
-                if parsed_tech_stack_raw and parsed_tech_stack_raw.lower() != 'none':
-                    parsed_tech_stack = [t.strip() for t in parsed_tech_stack_raw.split(',') if t.strip()]
-
-            if not parsed_tech_stack:  # If parsed_tech_stack is empty after LLM processing
+            # Technologies found on the resume are added after the ones the candidate typed
+            if st.session_state.interview.resume_ingestion:
+                with st.spinner("Reading your resume..."):
+                    st.session_state.interview.collect_resume_ingestion(wait=True)
+            parsed_tech_stack = merge_tech_stacks(llm_results.get("tech_stack_input") or [],
+                                                  st.session_state.interview.candidate_info["resume_techs"])
+            # Empty after LLM processing (a failed check was already reported above)
+            if not parsed_tech_stack and llm_results.get("tech_stack_input", []) is not None:
                 st.error("Please enter a valid list of technologies (e.g., Python, React, AWS).")
                 validation_passed = False
 
             if validation_passed:
-                st.session_state.candidate_info["full_name"] = full_name
-                st.session_state.candidate_info["email"] = email
-                st.session_state.candidate_info["country_code"] = selected_country_code
-                st.session_state.candidate_info["phone_number"] = f"{selected_country_code} {phone_number}"
-                st.session_state.candidate_info["years_experience"] = years_experience
-                st.session_state.candidate_info["desired_positions"] = desired_positions
-                st.session_state.candidate_info["current_location"] = current_location
-                st.session_state.candidate_info["tech_stack"] = parsed_tech_stack  # Use parsed technologies
-                st.session_state.candidate_info["linkedin_profile"] = linkedin_profile if linkedin_profile else None
-                st.session_state.candidate_info[
-                    "current_company"] = current_company if current_company and current_company.lower() != 'n/a' else 'N/A (Fresher)'
+                st.session_state.interview.submit_candidate_info(
+                    full_name=full_name,
+                    email=email,
+                    country_code=selected_country_code,
+                    phone_number=f"{selected_country_code} {phone_number}",
+                    years_experience=years_experience,
+                    desired_positions=desired_positions,
+                    current_location=current_location,
+                    tech_stack=parsed_tech_stack,  # Use parsed technologies
+                    linkedin_profile=linkedin_profile if linkedin_profile else None,
+                    current_company=current_company if current_company and current_company.lower() != 'n/a' else 'N/A (Fresher)')
 
                 # Transition to chat interface
                 st.session_state.page = "chatbot_interface"
-                st.session_state.conversation_stage = "start_screening"  # New stage to kick off chat
                 st.rerun()
     st.markdown("</div>", unsafe_allow_html=True)
 
 
+@st.fragment
+def render_chat_panel():
+    # Reruns on its own when the candidate sends a message; the insights and summary panels are left as they are
+    session = st.session_state.interview
+
+    # Technical Questions Progress
+    st.subheader("Technical Questions Progress")
+    num_questions_asked = len(session.candidate_info["technical_questions_generated"])
+    num_questions_answered = len(session.candidate_info["technical_Youtubes"])
+    st.markdown(f"*Answered:* {num_questions_answered} / {num_questions_asked}")
+
+    # Progress bar
+    if num_questions_asked > 0:
+        progress_percentage = (num_questions_answered / num_questions_asked) * 100
+        st.progress(progress_percentage / 100)
+    else:
+        st.progress(0)  # 0% if no questions asked yet
+    st.markdown("---")  # Separator
+
+    st.write("AI avatar + name “TalentBot”")  # Placeholder for AI avatar
+
+    st.markdown("<div class='chat-messages-area'>", unsafe_allow_html=True)
+    # Initial greeting from TalentBot if starting screening
+    if session.stage == "start_screening":
+        session.start_screening()
+        st.rerun()  # Rerun to display greeting and move to question generation
+
+    # Display the most recent chat messages; older ones load on demand
+    visible_messages = st.session_state.get("chat_visible_messages", CHAT_WINDOW_MESSAGES)
+    hidden_messages = max(0, len(session.messages) - visible_messages)
+    if hidden_messages:
+        if st.button(f"⬆️ Show earlier messages ({hidden_messages})", key="show_earlier_messages"):
+            st.session_state.chat_visible_messages = visible_messages + CHAT_WINDOW_MESSAGES
+            st.rerun(scope="fragment")
+    for message in session.messages[hidden_messages:]:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+
+    # The first question follows the greeting; its generation started when the info form was accepted
+    if session.stage == "generate_technical_questions":
+        with st.chat_message("assistant"):
+            with st.spinner("Preparing your technical questions..."):
+                session.ask_first_question()
+        st.rerun()  # Full rerun, so the insights panel starts polling
+    st.markdown("</div>", unsafe_allow_html=True)  # End chat-messages-area
+
+    # Input Box at the bottom of the chat window
+    if session.stage != "conclude_interview" and session.stage != "ended":
+        prompt_input = st.chat_input("Type your answer here...", key="chat_input")
+        if prompt_input:
+            with st.chat_message("user"):
+                st.markdown(prompt_input)
+
+            with st.chat_message("assistant"):
+                with st.spinner("Thinking..."):
+                    turn = session.step(prompt_input, render_stream=st.write_stream)
+                if turn["stage"] == "conclude_interview" and not turn["reply"]:
+                    st.session_state.page = "exit_page"  # The candidate ended the interview
+                    st.rerun()
+                # Render whatever wasn't already streamed into the chat bubble
+                response_text = turn["reply"]
+                if response_text.startswith(turn["streamed_text"]):
+                    response_text_to_render = response_text[len(turn["streamed_text"]):]
+                else:
+                    response_text_to_render = response_text
+                if response_text_to_render.strip():
+                    st.markdown(response_text_to_render)
+            if "stage" in turn["changes"] and turn["stage"] in ("conclude_interview", "ask_technical_questions"):
+                st.rerun()  # The insights panel starts or stops polling
+            st.rerun(scope="fragment")  # Only the chat needs to catch up
+
+
+@st.fragment
+def render_candidate_summary():
+    # Only changes with the info form, so chat turns never rerun it
+    info = st.session_state.interview.candidate_info
+    st.subheader("Candidate Summary")
+    st.markdown("---")
+
+    st.markdown(f"*Name:* {info['full_name'] if info['full_name'] else 'N/A'}")
+    st.markdown(f"*Email:* {info['email'] if info['email'] else 'N/A'}")
+    if info['linkedin_profile']:
+        st.markdown(f"*LinkedIn:* [{info['linkedin_profile']}]({info['linkedin_profile']})")
+    else:
+        st.markdown(f"*LinkedIn:* N/A")
+    st.markdown(f"*Company:* {info['current_company'] if info['current_company'] else 'N/A'}")
+    st.markdown(
+        f"*Experience:* {f'{info['years_experience']} years' if info['years_experience'] is not None else 'N/A'}")
+    st.markdown(f"*Preferred Role:* {info['desired_positions'] if info['desired_positions'] else 'N/A'}")
+    st.markdown(f"*Tech Stack:* {', '.join(info['tech_stack']) if info['tech_stack'] else 'N/A'}")
+
+    if info['resume_uploaded']:
+        st.markdown(":green[Resume Uploaded ✅]")
+    else:
+        st.markdown(":red[Resume Not Uploaded ❌]")
+
+
 def chatbot_interface():
+    session = st.session_state.interview
     # Main layout for chat and candidate summary
     # 3-column layout: Answer Insights | Chat Window | Candidate Summary
+    # Each panel is a fragment: a chat turn reruns the chat panel only, and the insights panel polls on its own
+    # for new answers and background evaluation results while the technical questions are under way.
     insights_col, chat_col, summary_col = st.columns([1, 2, 1])
 
     with insights_col:
         st.markdown("<div class='insights-panel'>", unsafe_allow_html=True)  # Start insights-panel
-        # Answer Insights
-        if st.session_state.candidate_info["technical_Youtubes"]:
-            st.subheader("Answer Insights")
-            st.markdown("---")
-            num_questions_answered = len(st.session_state.candidate_info["technical_Youtubes"])
-            if num_questions_answered > 0:
-                for q_text, answer in st.session_state.candidate_info["technical_Youtubes"].items():
-                    ai_detect = st.session_state.candidate_info["technical_answer_ai_detection"].get(q_text, 'N/A')
-                    sentiment = st.session_state.candidate_info["technical_answer_sentiment"].get(q_text, 'N/A')
-
-                    # Truncate question for display if too long
-                    display_q = q_text.split(' - ')[-1]  # Get just the question part
-                    if len(display_q) > 50:
-                        display_q = display_q[:50] + "..."
-
-                    st.markdown(f"*Q:* {display_q}")
-                    st.markdown(f"*AI Detection:* {ai_detect}, *Sentiment:* {sentiment}")
-                    st.markdown("---")
-            else:
-                st.markdown("No answer insights available yet.")
-        else:
-            st.subheader("Answer Insights")
-            st.markdown("---")
-            st.markdown("No answer insights available yet.")
+        polling = session.pending_evaluations or session.stage == "ask_technical_questions"
+        refresh_interval = ANSWER_INSIGHTS_REFRESH_SECONDS if polling else None
+        st.fragment(run_every=refresh_interval)(render_answer_insights)()
         st.markdown("</div>", unsafe_allow_html=True)  # End insights-panel
 
     with chat_col:
@@ -752,263 +812,12 @@ def chatbot_interface():
         components.html(get_interview_panel_html(current_status_text, current_stage_text, current_status_class),
                         height=180)
 
-        # Technical Questions Progress
-        st.subheader("Technical Questions Progress")
-        num_questions_asked = len(st.session_state.candidate_info["technical_questions_generated"])
-        num_questions_answered = len(st.session_state.candidate_info["technical_Youtubes"])
-        st.markdown(f"*Answered:* {num_questions_answered} / {num_questions_asked}")
-
-        # Progress bar
-        if num_questions_asked > 0:
-            progress_percentage = (num_questions_answered / num_questions_asked) * 100
-            st.progress(progress_percentage / 100)
-        else:
-            st.progress(0)  # 0% if no questions asked yet
-        st.markdown("---")  # Separator
-
-        st.write("AI avatar + name “TalentBot”")  # Placeholder for AI avatar
-
-        st.markdown("<div class='chat-messages-area'>", unsafe_allow_html=True)
-        # Initial greeting from TalentBot if starting screening
-        if st.session_state.conversation_stage == "start_screening":
-            greeting_message = f"👋 Hi {st.session_state.candidate_info['full_name']}, thanks for applying! Let's dive into your tech expertise. I'll now ask you some technical questions based on your skills."
-            st.session_state.messages.append({"role": "assistant", "content": greeting_message})
-            st.session_state.conversation_stage = "generate_technical_questions"
-            st.rerun()  # Rerun to display greeting and move to question generation
-
-        # Display existing chat messages
-        for message in st.session_state.messages:
-            with st.chat_message(message["role"]):
-                st.markdown(message["content"])
-        st.markdown("</div>", unsafe_allow_html=True)  # End chat-messages-area
-
-        # Input Box at the bottom of the chat window
-        if st.session_state.conversation_stage != "conclude_interview" and st.session_state.conversation_stage != "ended":
-            prompt_input = st.chat_input("Type your answer here...", key="chat_input")
-            if prompt_input:
-                st.session_state.messages.append({"role": "user", "content": prompt_input})
-                with st.chat_message("user"):
-                    st.markdown(prompt_input)
-
-                sentiment_result = analyze_sentiment(prompt_input)  # Still perform sentiment analysis
-
-                conversation_ending_keywords = ["bye", "exit", "quit", "thank you", "end conversation", "done",
-                                                "finish", "stop"]
-                if any(keyword in prompt_input.lower() for keyword in conversation_ending_keywords):
-                    response_text = "Acknowledged. Transitioning to conclusion."
-                    st.session_state.conversation_stage = "conclude_interview"
-
-                with st.chat_message("assistant"):
-                    with st.spinner("Thinking..."):
-                        current_stage = st.session_state.conversation_stage
-                        response_text = ""
-                        lang = st.session_state.candidate_info["preferred_language"]
-
-                        if current_stage == "generate_technical_questions":
-                            st.session_state.candidate_info["technical_questions_generated"] = []
-                            st.session_state.candidate_info["current_question_index"] = 0
-                            st.session_state.candidate_info["tech_stack_to_question"] = {}
-
-                            all_techs = st.session_state.candidate_info["tech_stack"]
-                            years_exp = st.session_state.candidate_info["years_experience"]
-
-                            if not all_techs:
-                                response_text = get_gemini_response(
-                                    "Inform user that no technologies were found for questions and suggest they go back to the info page to provide a tech stack, then restart the screening.",
-                                    is_history=False, preferred_language=lang
-                                )
-                                st.session_state.conversation_stage = "ended"
-                            else:
-                                techs_to_process = all_techs[:5]  # Limit to 5 technologies for questions
-                                for tech in techs_to_process:
-                                    question_gen_prompt = f"""
-                                    You are an AI Hiring Assistant for a tech recruitment agency.
-                                    The candidate has {years_exp} years of experience.
-                                    Based on the technology or concept "{tech}", generate 2-3 distinct, varied, and concise technical interview questions suitable for a candidate with {years_exp} years of experience.
-                                    Ensure a good mix of conceptual, practical/scenario-based, and best-practice questions.
-                                    Present them as a numbered list, one question per line. Do NOT include any introductory or concluding sentences or conversational filler.
-                                    Respond in {lang}.
-
-                                    Example for Python and 3 years experience:
-                                    1. Explain decorator patterns in Python and provide a use case.
-                                    2. How would you optimize a Python application for memory efficiency?
-                                    """
-                                    tech_questions_raw = get_gemini_response(question_gen_prompt, is_history=False,
-                                                                             preferred_language=lang)
-                                    cleaned_questions = []
-                                    for q in tech_questions_raw.split('\n'):
-                                        cleaned_q = re.sub(r"^\d+\.\s*", "", q).strip()
-                                        if cleaned_q:
-                                            cleaned_questions.append(cleaned_q)
-
-                                    # Ensure at least 2 questions are generated
-                                    while len(cleaned_questions) < 2:
-                                        cleaned_questions.append(get_gemini_response(
-                                            f"Generate a general question about {tech} for someone with {years_exp} years of experience.",
-                                            is_history=False, preferred_language=lang))
-
-                                    st.session_state.candidate_info["tech_stack_to_question"][tech] = cleaned_questions
-                                    st.session_state.candidate_info["technical_questions_generated"].extend(
-                                        [f"{tech}** - {q}" for q in cleaned_questions])
-
-                                if st.session_state.candidate_info["technical_questions_generated"]:
-                                    first_question = st.session_state.candidate_info["technical_questions_generated"][0]
-                                    response_text = f"Great! Let's start with the technical questions.\n\nQuestion {st.session_state.candidate_info['current_question_index'] + 1}: {first_question}"
-                                    st.session_state.conversation_stage = "ask_technical_questions"
-                                else:
-                                    response_text = get_gemini_response(
-                                        "Inform user that technical questions could not be generated and to try again later.",
-                                        is_history=False, preferred_language=lang
-                                    )
-                                    st.session_state.conversation_stage = "ended"
-
-                        elif current_stage == "ask_technical_questions":
-                            q_index = st.session_state.candidate_info["current_question_index"]
-                            question_text = st.session_state.candidate_info["technical_questions_generated"][q_index]
-                            candidate_answer = prompt_input.strip()
-
-                            if st.session_state.awaiting_elaboration:
-                                last_q_for_elaboration = st.session_state.last_question_for_elaboration
-                                if last_q_for_elaboration and last_q_for_elaboration in st.session_state.candidate_info[
-                                    "technical_Youtubes"]:
-                                    st.session_state.candidate_info["technical_Youtubes"][
-                                        last_q_for_elaboration] += "\n\n(Elaboration): " + candidate_answer
-                                else:
-                                    print(
-                                        f"Warning: Elaboration received but last_question_for_elaboration was not found: {last_q_for_elaboration}")
-                                    st.session_state.candidate_info["technical_Youtubes"][
-                                        question_text] = candidate_answer  # Fallback to current question
-
-                                st.session_state.awaiting_elaboration = False
-                                st.session_state.last_question_for_elaboration = None
-
-                                st.session_state.candidate_info["current_question_index"] += 1
-                                next_q_index = st.session_state.candidate_info["current_question_index"]
-                                total_questions = len(st.session_state.candidate_info["technical_questions_generated"])
-
-                                if next_q_index < total_questions:
-                                    next_question = st.session_state.candidate_info["technical_questions_generated"][
-                                        next_q_index]
-                                    response_text = get_gemini_response(
-                                        "Acknowledge additional details and present the next question.",
-                                        is_history=False, preferred_language=lang
-                                    ) + f"\n\nQuestion {next_q_index + 1}: {next_question}"
-                                else:
-                                    response_text = get_gemini_response(
-                                        "Acknowledge additional details and inform user that all technical questions are collected.",
-                                        is_history=False, preferred_language=lang
-                                    )
-                                    st.session_state.conversation_stage = "conclude_interview"
-
-                            else:  # Normal question answering flow
-                                st.session_state.candidate_info["technical_Youtubes"][question_text] = candidate_answer
-                                st.session_state.candidate_info["technical_answer_sentiment"][
-                                    question_text] = analyze_sentiment(candidate_answer)
-
-                                ai_detection_prompt = f"""
-                                Analyze the following candidate's answer to a technical question. Determine if the answer appears to be generated by an AI (e.g., overly formal, generic, comprehensive without natural pauses/hesitations, sounds like a textbook definition) or if it exhibits human-like characteristics (e.g., conversational, potentially less structured, specific examples from experience, some natural imperfection).
-                                Respond only with "AI-generated" or "Human-like".
-                                Respond in {lang}.
-
-                                Question: {question_text}
-                                Candidate Answer: {candidate_answer}
-                                """
-                                ai_detection_result = get_gemini_response(ai_detection_prompt, is_history=False,
-                                                                          preferred_language=lang).strip().replace('.',
-                                                                                                                   '')
-                                st.session_state.candidate_info["technical_answer_ai_detection"][
-                                    question_text] = ai_detection_result
-
-                                acknowledgment_prompt = f"""
-                                Given the following technical question and a candidate's response, provide a very brief (1-2 sentences), neutral, and encouraging acknowledgment or transition phrase.
-                                If the candidate's response seems brief, generic, or if it doesn't fully address the question, politely prompt them to "elaborate" or "provide more details" at the end of your acknowledgment.
-                                Do NOT provide correct answers, evaluate the correctness of the response, or give away solutions. If the response is a clear non-answer (e.g., 'no', 'I don't know', 'skip', 'abc'), acknowledge that politely and suggest moving on.
-                                Respond in {lang}.
-
-                                Question: {question_text}
-                                Candidate Response: {candidate_answer}
-
-                                Your acknowledgment/transition:
-                                """
-                                acknowledgment = get_gemini_response(acknowledgment_prompt, is_history=False,
-                                                                     preferred_language=lang).strip()
-
-                                is_elaboration_request = "?" in acknowledgment or any(
-                                    word in acknowledgment.lower() for word in
-                                    ["elaborate", "further", "more details", "can you tell me"])
-
-                                response_text_parts = [acknowledgment]
-                                # Removed the AI Detection/Sentiment from here as requested
-                                response_text_parts.append("\n---\n")
-
-                                if is_elaboration_request:
-                                    st.session_state.awaiting_elaboration = True
-                                    st.session_state.last_question_for_elaboration = question_text
-                                else:
-                                    st.session_state.candidate_info["current_question_index"] += 1
-                                    next_q_index = st.session_state.candidate_info["current_question_index"]
-                                    total_questions = len(
-                                        st.session_state.candidate_info["technical_questions_generated"])
-
-                                    if next_q_index < total_questions:
-                                        next_question = \
-                                        st.session_state.candidate_info["technical_questions_generated"][next_q_index]
-                                        response_text_parts.append(f"Question {next_q_index + 1}: {next_question}")
-                                    else:
-                                        response_text_parts.append(get_gemini_response(
-                                            "Thank user for answering all technical questions and inform that all necessary information is collected.",
-                                            is_history=False, preferred_language=lang
-                                        ))
-                                        st.session_state.conversation_stage = "conclude_interview"
-
-                                response_text = "\n".join(response_text_parts)
-
-                        elif st.session_state.conversation_stage == "conclude_interview":
-                            # This block should typically be reached via the conversation_ending_keywords or after all questions are answered
-                            # No user input is processed here, just transition to exit page
-                            response_text = ""  # No response here, handled by page transition
-                            st.session_state.page = "exit_page"
-                            st.rerun()
-
-                        else:
-                            # Fallback for unexpected conversation stages
-                            full_chat_history_for_llm = [{"role": m["role"], "parts": [m["content"]]} for m in
-                                                         st.session_state.messages]
-                            response_text = get_gemini_response(full_chat_history_for_llm, is_history=True,
-                                                                preferred_language=lang)
-                            if "sorry" in response_text.lower() or "understand" in response_text.lower():
-                                response_text += "\n\n" + get_gemini_response(
-                                    "Inform user chatbot is lost and ask to rephrase or tell what they want to do.",
-                                    is_history=False, preferred_language=lang
-                                )
-                    st.markdown(response_text)
-                    st.session_state.messages.append({"role": "assistant", "content": response_text})
-                st.rerun()  # Rerun to update the UI based on prompt processing
+        render_chat_panel()
         st.markdown("</div>", unsafe_allow_html=True)  # End chat-window-panel
 
     with summary_col:
         st.markdown("<div class='candidate-summary-panel'>", unsafe_allow_html=True)  # Start candidate-summary-panel
-        st.subheader("Candidate Summary")
-        st.markdown("---")
-
-        info = st.session_state.candidate_info
-        st.markdown(f"*Name:* {info['full_name'] if info['full_name'] else 'N/A'}")
-        st.markdown(f"*Email:* {info['email'] if info['email'] else 'N/A'}")
-        if info['linkedin_profile']:
-            st.markdown(f"*LinkedIn:* [{info['linkedin_profile']}]({info['linkedin_profile']})")
-        else:
-            st.markdown(f"*LinkedIn:* N/A")
-        st.markdown(f"*Company:* {info['current_company'] if info['current_company'] else 'N/A'}")
-        st.markdown(
-            f"*Experience:* {f'{info['years_experience']} years' if info['years_experience'] is not None else 'N/A'}")
-        st.markdown(f"*Preferred Role:* {info['desired_positions'] if info['desired_positions'] else 'N/A'}")
-        st.markdown(f"*Tech Stack:* {', '.join(info['tech_stack']) if info['tech_stack'] else 'N/A'}")
-
-        if info['resume_uploaded']:
-            st.markdown(":green[Resume Uploaded ✅]")
-        else:
-            st.markdown(":red[Resume Not Uploaded ❌]")
-
+        render_candidate_summary()
         st.markdown("</div>", unsafe_allow_html=True)  # End candidate-summary-panel
 
     st.markdown("</div>", unsafe_allow_html=True)  # End chat-main-container
@@ -1018,87 +827,43 @@ def exit_page():
     st.markdown("<div class='welcome-container'>",
                 unsafe_allow_html=True)  # Reusing welcome-container style for consistency
     st.markdown("<h1>🎉 Thank you!</h1>", unsafe_allow_html=True)
-    full_name = st.session_state.candidate_info["full_name"] if st.session_state.candidate_info[
+    full_name = st.session_state.interview.candidate_info["full_name"] if st.session_state.interview.candidate_info[
         "full_name"] else "Candidate"
     st.markdown(f"<h3>We've recorded your responses, {full_name}. Our recruiters will reach out shortly.</h3>",
                 unsafe_allow_html=True)
 
     st.markdown("---")
 
-    # Generate Hiring Recommendation Report
-    with st.spinner("Generating hiring recommendation..."):
-        info = st.session_state.candidate_info
-        lang = info["preferred_language"]
-
-        report_prompt = f"""
-        You are an AI Hiring Manager. Based on the following candidate's profile and their performance in a technical screening, provide a concise hiring recommendation.
-        Your recommendation should include:
-        1. A clear "Hire", "Do Not Hire", or "Maybe" verdict.
-        2. A brief justification for the verdict, considering:
-           - Completeness and clarity of provided personal information.
-           - Relevance of their experience and desired role to their tech stack.
-           - Overall perceived quality and depth of their technical answers (DO NOT evaluate correctness, only perceived effort/engagement).
-           - General sentiment from their technical answers.
-           - Any red flags (e.g., consistently generic/AI-generated answers, lack of engagement).
-           - Consideration of their years of experience and if the answers align with it.
-        3. A summary of their strengths and areas for potential development based on the technical answers.
-
-        Maintain a professional and objective tone.
-
-        Candidate Information:
-        Name: {info['full_name']}
-        Email: {info['email']}
-        Phone: {info['phone_number']}
-        Current Company: {info['current_company']}
-        Years of Experience: {info['years_experience']}
-        Desired Positions: {info['desired_positions']}
-        Location: {info['current_location']}
-        Tech Stack: {', '.join(info['tech_stack'])}
-        Resume Uploaded: {info['resume_uploaded']}
-        LinkedIn Profile: {info['linkedin_profile'] if info['linkedin_profile'] else 'N/A'}
-
-        Technical Questions and Answers:
-        """
-        for q, a in info["technical_Youtubes"].items():
-            ai_detect = info["technical_answer_ai_detection"].get(q, 'N/A')
-            sentiment = info["technical_answer_sentiment"].get(q, 'N/A')
-            report_prompt += f"\n- Q: {q}\n  A: {a}\n  AI Detection: {ai_detect}, Sentiment: {sentiment}\n"
-
-        all_sentiments = [s for s in info["technical_answer_sentiment"].values() if s != 'N/A']
-        if all_sentiments:
-            positive_count = all_sentiments.count("Positive 😊")
-            negative_count = all_sentiments.count("Negative 😞")
-            neutral_count = all_sentiments.count("Neutral 😐")
-            report_prompt += f"\nOverall sentiment of technical answers: Positive ({positive_count}), Negative ({negative_count}), Neutral ({neutral_count})."
-        else:
-            report_prompt += "\nOverall sentiment of technical answers: Not enough data."
-
-        report_prompt += "\n\nHiring Recommendation Report:"
-
-        hiring_report = get_gemini_response(report_prompt, is_history=False, preferred_language=lang)
-        st.markdown(f"### Hiring Recommendation:\n{hiring_report}")
+    # Generate Hiring Recommendation Report (stored once per distinct interview content)
+    session = st.session_state.interview
+    if session.pending_evaluations or session.pending_digests:
+        with st.spinner("Finalizing answer insights..."):
+            session.collect_answer_evaluations(wait=True)  # The report needs every digest and label
+    st.markdown("### Hiring Recommendation:")
+    if session.has_hiring_report():
+        st.markdown(session.get_hiring_report())
+    else:
+        # Streamed so the recruiter sees the verdict as soon as the first tokens arrive
+        if session.get_hiring_report(render_stream=st.write_stream) is None:
+            st.warning("The hiring recommendation couldn't be generated right now. "
+                       "Use Regenerate Recommendation to try again.")
 
     st.markdown("---")
 
     # Options buttons
-    col1, col2 = st.columns(2)
+    col1, col2, col3 = st.columns(3)
     with col1:
         # Placeholder for download summary PDF
         st.button("📄 Download Summary PDF", key="download_summary_pdf")
     with col2:
+        if st.button("🔁 Regenerate Recommendation", key="regenerate_hiring_report"):
+            session.discard_hiring_report()
+            st.rerun()
+    with col3:
         if st.button("🔄 Return to Home", key="return_to_home_exit"):
             st.session_state.page = "welcome"
-            # Reset all session state for a fresh start
-            st.session_state.messages = []
-            st.session_state.candidate_info = {
-                "full_name": None, "email": None, "phone_number": None, "country_code": None,
-                "years_experience": None, "desired_positions": None, "current_location": None,
-                "tech_stack": [], "technical_questions_generated": [], "current_question_index": 0,
-                "technical_answer_ai_detection": {}, "technical_answer_sentiment": {},
-                "tech_stack_to_question": {}, "preferred_language": "English",
-                "resume_uploaded": False, "linkedin_profile": None, "current_company": None
-            }
-            st.session_state.conversation_stage = "greeting"
+            # Reset everything for a fresh start
+            st.session_state.interview = new_interview()
             st.rerun()
     st.markdown("</div>", unsafe_allow_html=True)
 
@@ -1112,3 +877,17 @@ elif st.session_state.page == "chatbot_interface":
     chatbot_interface()
 elif st.session_state.page == "exit_page":
     exit_page()
+
+# Keep the resume link in the address bar once the interview has been stored
+resume_token = st.session_state.interview.resume_token
+if resume_token and st.query_params.get("session") != resume_token:
+    st.query_params["session"] = resume_token
+elif not resume_token and "session" in st.query_params:
+    del st.query_params["session"]
+
+if st.session_state.interview.timeline:
+    with st.sidebar.expander("Model call timeline"):
+        st.dataframe(st.session_state.interview.timeline)
+
+if os.getenv("HIREBOT_PROFILE"):
+    st.sidebar.caption(f"⏱️ Script run: {(time.perf_counter() - _script_run_started) * 1000:.1f} ms")
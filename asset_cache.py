@@ -0,0 +1,131 @@
+"""Local cache for remote UI assets (Lottie animations) so page renders never wait on a CDN.
+
+Lookup order: in-process copy -> on-disk cache -> bundled copy under assets/. Stale assets are refreshed on
+a background thread with a strict timeout. An asset that is neither cached nor bundled is fetched once,
+blocking the first render for at most COLD_FETCH_TIMEOUT, so a fresh deployment still shows it. Bundle them at
+build time (needed for offline deployments) with:
+    python asset_cache.py fetch
+"""
+import argparse
+import json
+import os
+import threading
+import time
+
+import requests
+
+BUNDLED_ASSET_DIR = os.path.join("assets", "lottie")
+CACHE_ASSET_DIR = os.path.join(".cache", "assets")
+ASSET_FETCH_TIMEOUT = (2, 5)  # (connect, read) seconds
+COLD_FETCH_TIMEOUT = (1, 2)  # For the one blocking fetch of an asset with no cached or bundled copy
+ASSET_REFRESH_SECONDS = 24 * 60 * 60
+ASSET_RETRY_SECONDS = 5 * 60  # Back-off after a failed refresh (e.g. while offline)
+
+LOTTIE_ASSETS = {
+    "robot": "https://lottie.host/80e90924-f7b6-455b-b997-3d906151f158/xV2xM95m0S.json",
+}
+
+_assets = {}  # name -> parsed animation JSON (None if neither cached nor bundled)
+_next_refresh_at = {}  # name -> time after which a background refresh is due
+_refreshing = set()
+_lock = threading.Lock()
+_cold_fetch_lock = threading.Lock()  # Held during a blocking first fetch, so concurrent first renders share it
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def fetch_lottie(url, timeout=ASSET_FETCH_TIMEOUT):
+    response = requests.get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+def _refresh(name, timeout=ASSET_FETCH_TIMEOUT):
+    try:
+        data = fetch_lottie(LOTTIE_ASSETS[name], timeout=timeout)
+        _write_json(os.path.join(CACHE_ASSET_DIR, f"{name}.json"), data)
+        with _lock:
+            _assets[name] = data
+            _next_refresh_at[name] = time.time() + ASSET_REFRESH_SECONDS
+    except Exception as e:
+        print(f"Could not refresh asset '{name}': {e}")
+        with _lock:
+            _next_refresh_at[name] = time.time() + ASSET_RETRY_SECONDS
+    finally:
+        with _lock:
+            _refreshing.discard(name)
+
+
+def _schedule_refresh(name):
+    with _lock:
+        if name in _refreshing:
+            return
+        _refreshing.add(name)
+    threading.Thread(target=_refresh, args=(name,), name=f"asset-refresh-{name}", daemon=True).start()
+
+
+def _fetch_cold(name):
+    # First render with no local copy at all: one short blocking fetch per process. A failure leaves None in
+    # place with the usual retry back-off, so later renders don't block again.
+    with _cold_fetch_lock:
+        with _lock:
+            if name in _assets:
+                return
+            _refreshing.add(name)
+        _refresh(name, timeout=COLD_FETCH_TIMEOUT)
+        with _lock:
+            _assets.setdefault(name, None)
+
+
+def get_lottie_animation(name):
+    # Blocks on the network only for an asset with no cached or bundled copy, once per process (see _fetch_cold);
+    # returns None if that fetch failed
+    with _lock:
+        loaded = name in _assets
+    if not loaded:
+        cache_path = os.path.join(CACHE_ASSET_DIR, f"{name}.json")
+        data = _read_json(cache_path)
+        next_refresh_at = os.path.getmtime(cache_path) + ASSET_REFRESH_SECONDS if data is not None else 0
+        if data is None:
+            data = _read_json(os.path.join(BUNDLED_ASSET_DIR, f"{name}.json"))
+        if data is None:
+            _fetch_cold(name)
+        with _lock:
+            if name not in _assets:
+                _assets[name] = data
+                _next_refresh_at[name] = next_refresh_at
+
+    with _lock:
+        data = _assets[name]
+        refresh_due = time.time() >= _next_refresh_at[name]
+    if refresh_due:
+        _schedule_refresh(name)
+    return data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bundle remote UI assets for offline use.")
+    parser.add_argument("command", choices=["fetch"])
+    parser.parse_args(argv)
+
+    for name, url in LOTTIE_ASSETS.items():
+        _write_json(os.path.join(BUNDLED_ASSET_DIR, f"{name}.json"), fetch_lottie(url))
+        print(f"Bundled '{name}' from {url}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""Per-call-site latency and token metrics for Gemini calls.
+
+Every call made through gemini_client carries a call-site tag (validate_position, question_generation,
+hiring_report, ...) and is recorded here: wall time, time to first byte, input/output tokens from
+usage_metadata, retries, cache hits, coalesced calls and errors. The process-wide registry can be exported as
+Prometheus text (HIREBOT_METRICS_PORT serves /metrics) and/or written as JSON every
+HIREBOT_METRICS_JSON_SECONDS to HIREBOT_METRICS_JSON_PATH. `python call_metrics.py report PATH` ranks the call
+sites in such a file by time and tokens.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+UNSPECIFIED_CALL_SITE = "unspecified"
+LATENCY_BUCKETS_SECONDS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+DEFAULT_JSON_EXPORT_SECONDS = 60
+METRIC_PREFIX = "hirebot_gemini"
+
+COUNTERS = {
+    "calls": "Logical Gemini calls",
+    "errors": "Calls that failed after all retries",
+    "retries": "Upstream attempts beyond the first",
+    "cache_hits": "Calls answered from the response cache",
+    "coalesced": "Calls that shared another caller's in-flight request",
+    "input_tokens": "Prompt tokens reported by usage_metadata",
+    "output_tokens": "Response tokens reported by usage_metadata",
+    "rate_limit_wait_seconds": "Seconds spent waiting on the rate limiter",
+}
+HISTOGRAMS = {
+    "duration_seconds": "Wall time of the call, including rate limiting and retries",
+    "time_to_first_byte_seconds": "Time until the first text was available (the whole reply, unless streamed)",
+}
+
+
+def usage_tokens(response):
+    # (input, output) token counts from a response or streamed chunk; (0, 0) when the model didn't report them
+    usage = getattr(response, "usage_metadata", None)
+    input_tokens = getattr(usage, "prompt_token_count", None)
+    output_tokens = getattr(usage, "candidates_token_count", None)
+    return (input_tokens if isinstance(input_tokens, int) else 0,
+            output_tokens if isinstance(output_tokens, int) else 0)
+
+
+class _Histogram:
+
+    def __init__(self):
+        self.bucket_counts = [0] * len(LATENCY_BUCKETS_SECONDS)  # Non-cumulative; cumulated on export
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(LATENCY_BUCKETS_SECONDS):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+                break
+
+    def to_dict(self):
+        return {"count": self.count, "sum": round(self.sum, 6), "buckets": dict(zip(
+            (str(b) for b in LATENCY_BUCKETS_SECONDS), self.bucket_counts))}
+
+
+class CallMetrics:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}  # call site -> {counter name: value}
+        self._histograms = {}  # call site -> {histogram name: _Histogram}
+        self._error_types = {}  # (call site, exception class name) -> count
+        self.started_at = time.time()
+
+    def record(self, call_site, duration_seconds, first_byte_seconds=None, input_tokens=0, output_tokens=0,
+               attempts=1, cached=False, coalesced=False, error=None, rate_limit_wait_seconds=0.0):
+        call_site = call_site or UNSPECIFIED_CALL_SITE
+        with self._lock:
+            counters = self._counters.get(call_site)
+            if counters is None:
+                counters = self._counters[call_site] = dict.fromkeys(COUNTERS, 0)
+                self._histograms[call_site] = {name: _Histogram() for name in HISTOGRAMS}
+            counters["calls"] += 1
+            counters["retries"] += max(0, attempts - 1)
+            counters["cache_hits"] += int(cached)
+            counters["coalesced"] += int(coalesced)
+            counters["input_tokens"] += input_tokens
+            counters["output_tokens"] += output_tokens
+            counters["rate_limit_wait_seconds"] += rate_limit_wait_seconds
+            if error is not None:
+                counters["errors"] += 1
+                key = (call_site, type(error).__name__)
+                self._error_types[key] = self._error_types.get(key, 0) + 1
+            histograms = self._histograms[call_site]
+            histograms["duration_seconds"].observe(duration_seconds)
+            if first_byte_seconds is not None:
+                histograms["time_to_first_byte_seconds"].observe(first_byte_seconds)
+
+    def snapshot(self):
+        with self._lock:
+            call_sites = {}
+            for call_site, counters in self._counters.items():
+                call_sites[call_site] = dict(counters, **{name: histogram.to_dict() for name, histogram
+                                                           in self._histograms[call_site].items()})
+                call_sites[call_site]["rate_limit_wait_seconds"] = round(counters["rate_limit_wait_seconds"], 6)
+                call_sites[call_site]["error_types"] = {error_type: count for (site, error_type), count
+                                                        in self._error_types.items() if site == call_site}
+        return {"started_at": self.started_at, "exported_at": time.time(), "call_sites": call_sites}
+
+    def render_prometheus(self):
+        call_sites = self.snapshot()["call_sites"]
+        lines = []
+        for name, help_text in COUNTERS.items():
+            metric = f"{METRIC_PREFIX}_{name}_total"
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+            lines += [f'{metric}{{call_site="{site}"}} {stats[name]}' for site, stats in sorted(call_sites.items())]
+        metric = f"{METRIC_PREFIX}_errors_by_type_total"
+        lines += [f"# HELP {metric} Failed calls by exception type", f"# TYPE {metric} counter"]
+        for site, stats in sorted(call_sites.items()):
+            lines += [f'{metric}{{call_site="{site}",error="{error_type}"}} {count}'
+                      for error_type, count in sorted(stats["error_types"].items())]
+        for name, help_text in HISTOGRAMS.items():
+            metric = f"{METRIC_PREFIX}_{name}"
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+            for site, stats in sorted(call_sites.items()):
+                histogram = stats[name]
+                cumulative = 0
+                for bound, count in histogram["buckets"].items():
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{call_site="{site}",le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{call_site="{site}",le="+Inf"}} {histogram["count"]}')
+                lines.append(f'{metric}_sum{{call_site="{site}"}} {histogram["sum"]}')
+                lines.append(f'{metric}_count{{call_site="{site}"}} {histogram["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp_path, path)
+
+
+# --- Exporters ---
+
+def start_json_exporter(metrics, path, interval_seconds):
+    def export_loop():
+        while True:
+            time.sleep(interval_seconds)
+            try:
+                metrics.write_json(path)
+            except OSError as e:
+                print(f"Error writing call metrics to {path}: {e}")
+
+    threading.Thread(target=export_loop, name="call-metrics-json", daemon=True).start()
+
+
+def start_prometheus_server(metrics, port):
+    class MetricsHandler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):  # Scrapes would otherwise flood the app's console
+            pass
+
+    try:
+        server = ThreadingHTTPServer(("", port), MetricsHandler)
+    except OSError as e:
+        print(f"Error starting the metrics endpoint on port {port}: {e}")
+        return None
+    threading.Thread(target=server.serve_forever, name="call-metrics-http", daemon=True).start()
+    return server
+
+
+_default_metrics = None
+_default_metrics_lock = threading.Lock()
+
+
+def get_call_metrics():
+    # Shared by every caller of gemini_client in the process; exporters start with it, once
+    global _default_metrics
+    with _default_metrics_lock:
+        if _default_metrics is None:
+            _default_metrics = CallMetrics()
+            port = os.getenv("HIREBOT_METRICS_PORT")
+            if port:
+                start_prometheus_server(_default_metrics, int(port))
+            json_path = os.getenv("HIREBOT_METRICS_JSON_PATH")
+            if json_path:
+                start_json_exporter(_default_metrics, json_path,
+                                    float(os.getenv("HIREBOT_METRICS_JSON_SECONDS", DEFAULT_JSON_EXPORT_SECONDS)))
+        return _default_metrics
+
+
+# --- Report CLI ---
+
+def print_report(snapshot):
+    call_sites = snapshot["call_sites"]
+    total_seconds = sum(stats["duration_seconds"]["sum"] for stats in call_sites.values()) or 1
+    total_tokens = sum(stats["input_tokens"] + stats["output_tokens"] for stats in call_sites.values()) or 1
+    print(f"{'call site':<32} {'calls':>7} {'time %':>7} {'mean s':>8} {'ttfb s':>8} {'tokens %':>8} "
+          f"{'in tok':>9} {'out tok':>9} {'retries':>7} {'cached':>7} {'errors':>6}")
+    for site, stats in sorted(call_sites.items(), key=lambda item: -item[1]["duration_seconds"]["sum"]):
+        duration, first_byte = stats["duration_seconds"], stats["time_to_first_byte_seconds"]
+        tokens = stats["input_tokens"] + stats["output_tokens"]
+        mean_seconds = duration["sum"] / duration["count"] if duration["count"] else 0
+        mean_first_byte = first_byte["sum"] / first_byte["count"] if first_byte["count"] else 0
+        print(f"{site:<32} {stats['calls']:>7} {duration['sum'] / total_seconds * 100:>6.1f}% "
+              f"{mean_seconds:>8.3f} {mean_first_byte:>8.3f} {tokens / total_tokens * 100:>7.1f}% "
+              f"{stats['input_tokens']:>9} {stats['output_tokens']:>9} {stats['retries']:>7} "
+              f"{stats['cache_hits']:>7} {stats['errors']:>6}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize exported Gemini call metrics by call site.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    report_parser = subparsers.add_parser("report", help="Rank call sites in a metrics JSON file by time and tokens.")
+    report_parser.add_argument("path", help="File written by the JSON exporter (HIREBOT_METRICS_JSON_PATH).")
+    args = parser.parse_args(argv)
+
+    with open(args.path, encoding="utf-8") as f:
+        print_report(json.load(f))
+
+
+if __name__ == "__main__":
+    main()
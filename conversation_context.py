@@ -0,0 +1,100 @@
+"""Bounded chat history for history-mode Gemini calls.
+
+The most recent messages are sent verbatim; older ones are folded, a batch at a time, into a rolling summary
+that is updated incrementally (previous summary + newly folded messages). Every call stays within a token
+budget, so the per-turn cost no longer grows with the length of the conversation.
+"""
+
+CHARS_PER_TOKEN = 4
+RECENT_MESSAGES = 8  # Kept verbatim
+FOLD_BATCH_MESSAGES = 4  # Older messages are summarized once this many have left the recent window
+HISTORY_TOKEN_BUDGET = 2000  # Summary + recent messages, per call
+SUMMARY_TOKEN_BUDGET = 400
+SUMMARY_MAX_WORDS = 200
+FOLDED_MESSAGE_TOKENS = 300  # Per message, in the summarization prompt
+
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def truncate_to_tokens(text, max_tokens):
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    return text if len(text) <= max_chars else text[:max_chars].rstrip() + " …"
+
+
+def build_summary_prompt(summary, messages, lang):
+    transcript = "\n".join(f"{'Candidate' if m['role'] == 'user' else 'TalentBot'}: "
+                           f"{truncate_to_tokens(m['content'], FOLDED_MESSAGE_TOKENS)}" for m in messages)
+    return f"""
+    You are maintaining a running summary of a screening chat between a candidate and TalentBot, a hiring assistant.
+    Update the current summary with the new messages. Keep what the rest of the conversation may rely on (what the candidate said about themselves, questions asked, anything promised); drop greetings and filler.
+    Use at most {SUMMARY_MAX_WORDS} words. Write the summary in {lang}. Return only the updated summary.
+
+    Current summary: {summary or "(none yet)"}
+
+    New messages:
+    {transcript}
+
+    Updated summary:
+    """
+
+
+class ConversationContext:
+    # Per-session state: the rolling summary and how many leading messages it covers. The message list itself
+    # stays owned by the caller and is only ever appended to.
+
+    def __init__(self, recent_messages=RECENT_MESSAGES, fold_batch=FOLD_BATCH_MESSAGES,
+                 token_budget=HISTORY_TOKEN_BUDGET, summary_token_budget=SUMMARY_TOKEN_BUDGET):
+        self.recent_messages = recent_messages
+        self.fold_batch = fold_batch
+        self.token_budget = token_budget
+        self.summary_token_budget = summary_token_budget
+        self.summary = ""
+        self.summarized_count = 0
+
+    def _window_tokens(self, messages):
+        return sum(estimate_tokens(m["content"]) for m in messages)
+
+    def _fold_boundary(self, messages):
+        # Everything before the boundary belongs in the summary; the last message is always kept verbatim
+        boundary = max(self.summarized_count, len(messages) - self.recent_messages)
+        window_budget = self.token_budget - self.summary_token_budget
+        while boundary < len(messages) - 1 and self._window_tokens(messages[boundary:]) > window_budget:
+            boundary += 1
+        return boundary
+
+    def _fold(self, messages, boundary, llm, lang):
+        prompt = build_summary_prompt(self.summary, messages[self.summarized_count:boundary], lang)
+        try:
+            summary = llm.get_response(prompt, is_history=False, preferred_language=lang, raise_errors=True,
+                                       call_site="conversation_summary")
+        except Exception as e:
+            # Keep the old summary and retry the fold next turn; the messages are left out of this call only
+            print(f"Error updating conversation summary: {e}")
+            return
+        self.summary = truncate_to_tokens(summary.strip(), self.summary_token_budget)
+        self.summarized_count = boundary
+
+    def build(self, messages, llm, lang):
+        # Returns the message list to send with is_history=True, within token_budget
+        window_budget = self.token_budget - self.summary_token_budget
+        boundary = self._fold_boundary(messages)
+        over_budget = self._window_tokens(messages[self.summarized_count:]) > window_budget
+        if boundary - self.summarized_count >= self.fold_batch or (boundary > self.summarized_count and over_budget):
+            self._fold(messages, boundary, llm, lang)
+
+        # Unfolded messages stay verbatim while they fit; after a failed fold, the ones that don't are left out
+        start = self.summarized_count
+        if self._window_tokens(messages[start:]) > window_budget:
+            start = boundary
+        window = [dict(m) for m in messages[start:]]
+        if window and self._window_tokens(window) > window_budget:
+            window[-1]["content"] = truncate_to_tokens(window[-1]["content"], window_budget)
+
+        if not self.summary:
+            return window
+        context = [{"role": "user", "content": f"Summary of the conversation so far: {self.summary}"}]
+        if window and window[0]["role"] == "user":
+            context.append({"role": "assistant", "content": "Understood."})  # Keep the roles alternating
+        return context + window
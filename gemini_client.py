@@ -0,0 +1,355 @@
+"""Gemini client shared by the Streamlit app and offline tooling (no Streamlit imports here)."""
+import json
+import os
+import random
+import threading
+import time
+
+from call_metrics import UNSPECIFIED_CALL_SITE, get_call_metrics, usage_tokens
+from rate_limiter import PRIORITY_CANDIDATE, get_rate_limiter
+from response_cache import get_response_cache, make_cache_key
+from single_flight import get_single_flight
+
+DEFAULT_MODEL_NAME = "gemini-2.0-flash"
+
+# Candidate-facing text for a call that failed for good; the error itself only goes to the log
+FALLBACK_REPLY = "I apologize, I couldn't generate a response. Please try again."
+
+MAX_ATTEMPTS = 4
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 8.0
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+RETRYABLE_ERROR_NAMES = {"ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "InternalServerError",
+                         "DeadlineExceeded", "GatewayTimeout", "ConnectionError", "TimeoutError"}
+CHARS_PER_TOKEN = 4
+OUTPUT_TOKEN_ESTIMATE = 256  # Reserved per call before usage_metadata reports the real count
+
+_model = None
+_model_name = DEFAULT_MODEL_NAME
+_model_lock = threading.RLock()
+
+
+class GeminiResponseError(Exception):
+    pass
+
+
+def configure_gemini(api_key, model_name=DEFAULT_MODEL_NAME):
+    # google.generativeai is imported here rather than at module level: it is the slowest import
+    # in the app and pages that never call the model shouldn't pay for it.
+    global _model, _model_name
+    import google.generativeai as genai
+
+    with _model_lock:
+        genai.configure(api_key=api_key)
+        _model = genai.GenerativeModel(model_name)
+        _model_name = model_name
+
+
+def use_model(model, model_name):
+    # Swaps in any object with a compatible generate_content (e.g. load_test's stand-in model) for every caller
+    global _model, _model_name
+    with _model_lock:
+        _model = model
+        _model_name = model_name
+
+
+def get_model():
+    # Lazily configured from GOOGLE_API_KEY on first use, then shared by every session in the process
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                api_key = os.getenv("GOOGLE_API_KEY")
+                if not api_key:
+                    raise RuntimeError("Gemini is not configured: set GOOGLE_API_KEY or call configure_gemini().")
+                configure_gemini(api_key, _model_name)
+    return _model
+
+
+def get_model_name():
+    return f"models/{_model_name}"
+
+
+# --- Gemini Calls ---
+
+def build_gemini_request(prompt_or_history, is_history=True, generation_config=None, response_schema=None,
+                         preferred_language="English"):
+    # Returns (contents, generation_config) for model.generate_content
+    language_instruction = f"Respond concisely and professionally, in {preferred_language}. "
+
+    if is_history:
+        # Gemini calls the assistant role "model"
+        formatted_history = [{"role": "model" if m["role"] == "assistant" else m["role"], "parts": [m["content"]]}
+                             for m in prompt_or_history]
+        if formatted_history and formatted_history[-1]["role"] == "user":
+            formatted_history[-1]["parts"][0] = language_instruction + formatted_history[-1]["parts"][0]
+        else:
+            formatted_history.append({"role": "user", "parts": [language_instruction]})
+    else:
+        formatted_history = [{"role": "user", "parts": [language_instruction + prompt_or_history]}]
+
+    payload = {"contents": formatted_history}
+    if response_schema:
+        payload["generationConfig"] = {"response_mime_type": "application/json", "response_schema": response_schema}
+    if generation_config:
+        if "generationConfig" in payload:
+            payload["generationConfig"].update(generation_config)
+        else:
+            payload["generationConfig"] = generation_config
+    return formatted_history, payload.get("generationConfig")
+
+
+class GeminiResult:
+    # Outcome of one logical model call: `value` (text, or parsed JSON for schema calls) or the final `error`
+
+    def __init__(self, value=None, error=None, attempts=0, cached=False, coalesced=False):
+        self.value = value
+        self.error = error
+        self.attempts = attempts  # Upstream attempts made by this caller (0 for cache hits and coalesced calls)
+        self.cached = cached
+        self.coalesced = coalesced  # Shared another caller's in-flight request
+        self.input_tokens = 0  # From usage_metadata, summed over attempts; 0 when no tokens were spent here
+        self.output_tokens = 0
+        self.rate_limit_wait_seconds = 0.0
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        return f"GeminiResult(ok={self.ok}, attempts={self.attempts}, cached={self.cached}, coalesced={self.coalesced})"
+
+
+def is_retryable_error(error):
+    # Quota (429), transient server errors and timeouts; google.api_core errors carry the HTTP status in .code
+    if isinstance(error, GeminiResponseError):  # Blocked or malformed replies won't improve on retry
+        return False
+    code = getattr(error, "code", None)
+    if isinstance(code, int) and code in RETRYABLE_STATUS_CODES:
+        return True
+    return type(error).__name__ in RETRYABLE_ERROR_NAMES or "429" in str(error)
+
+
+def backoff_seconds(attempt):
+    # Full jitter, so clients that hit the quota together don't retry together
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+def estimate_request_tokens(formatted_history):
+    prompt_chars = sum(len(part) for message in formatted_history for part in message["parts"])
+    return prompt_chars // CHARS_PER_TOKEN + OUTPUT_TOKEN_ESTIMATE
+
+
+def _settle_tokens(response, estimated_tokens):
+    usage = getattr(response, "usage_metadata", None)
+    total_tokens = getattr(usage, "total_token_count", None)
+    if isinstance(total_tokens, int):
+        get_rate_limiter().adjust_tokens(total_tokens - estimated_tokens)
+        return True
+    return False
+
+
+def _release_tokens(response, estimated_tokens):
+    # A failed attempt: settle on the usage it reported, if any, else refund the whole reservation, so failures
+    # don't throttle healthy calls on capacity that was never used
+    if response is None or not _settle_tokens(response, estimated_tokens):
+        get_rate_limiter().adjust_tokens(-estimated_tokens)
+
+
+def _response_value(response, response_schema):
+    if not response.candidates:
+        raise GeminiResponseError(f"No candidates found in response: {response}")
+    text_content = response.candidates[0].content.parts[0].text
+    if not response_schema:
+        return text_content
+    try:
+        return json.loads(text_content)
+    except json.JSONDecodeError:
+        raise GeminiResponseError(f"Expected JSON, but received non-JSON: {text_content}")
+
+
+def _record_call(call_site, started, first_byte_at, result, streamed, timeline):
+    # Feeds the process-wide call metrics and, when the caller passed one, its per-session timeline list
+    finished = time.monotonic()
+    first_byte_seconds = None if first_byte_at is None else first_byte_at - started
+    get_call_metrics().record(call_site, finished - started, first_byte_seconds, result.input_tokens,
+                              result.output_tokens, result.attempts, result.cached, result.coalesced, result.error,
+                              result.rate_limit_wait_seconds)
+    if timeline is not None:
+        timeline.append({
+            "call_site": call_site,
+            "started_at": time.time() - (finished - started),
+            "duration_ms": round((finished - started) * 1000, 1),
+            "first_byte_ms": None if first_byte_seconds is None else round(first_byte_seconds * 1000, 1),
+            "input_tokens": result.input_tokens,
+            "output_tokens": result.output_tokens,
+            "attempts": result.attempts,
+            "cached": result.cached,
+            "coalesced": result.coalesced,
+            "streamed": streamed,
+            "ok": result.ok,
+        })
+
+
+def _call_model(formatted_history, request_config, response_schema, cache_key, priority):
+    estimated_tokens = estimate_request_tokens(formatted_history)
+    result = GeminiResult()
+    while True:
+        result.attempts += 1
+        result.rate_limit_wait_seconds += get_rate_limiter().acquire(estimated_tokens, priority=priority)
+        response, settled = None, False
+        try:
+            response = get_model().generate_content(formatted_history, generation_config=request_config)
+            _settle_tokens(response, estimated_tokens)
+            settled = True
+            input_tokens, output_tokens = usage_tokens(response)
+            result.input_tokens += input_tokens
+            result.output_tokens += output_tokens
+            result.value = _response_value(response, response_schema)
+        except Exception as e:
+            if not settled:
+                _release_tokens(response, estimated_tokens)
+            if result.attempts < MAX_ATTEMPTS and is_retryable_error(e):
+                time.sleep(backoff_seconds(result.attempts))
+                continue
+            print(f"Error calling Gemini API (attempt {result.attempts}): {e}")
+            result.error = e
+            return result
+        if cache_key:
+            get_response_cache().set(cache_key, result.value)
+        return result
+
+
+def generate_gemini(prompt_or_history, is_history=True, generation_config=None, response_schema=None,
+                    preferred_language="English", cache=False, priority=PRIORITY_CANDIDATE, single_flight=True,
+                    call_site=UNSPECIFIED_CALL_SITE, timeline=None):
+    # Cache lookup, then rate limiting and up to MAX_ATTEMPTS tries with backoff on retryable errors.
+    # Never raises for model errors: the caller decides what a failure means through GeminiResult.
+    # single_flight=True lets concurrent identical requests (same model, contents, language and config) share
+    # one upstream call; pass False where identical prompts are meant to yield different replies.
+    # call_site names the prompt in the call metrics; timeline, if given, is a list that gets one event per call.
+    started = time.monotonic()
+    result = _generate_gemini(prompt_or_history, is_history, generation_config, response_schema, preferred_language,
+                              cache, priority, single_flight)
+    _record_call(call_site, started, time.monotonic(), result, False, timeline)
+    return result
+
+
+def _generate_gemini(prompt_or_history, is_history, generation_config, response_schema, preferred_language, cache,
+                     priority, single_flight):
+    formatted_history, request_config = build_gemini_request(prompt_or_history, is_history, generation_config,
+                                                             response_schema, preferred_language)
+
+    request_key = None
+    if cache or single_flight:
+        request_key = make_cache_key(get_model_name(), formatted_history, preferred_language,
+                                     generation_config=request_config, response_schema=response_schema)
+    cache_key = request_key if cache else None
+    if cache_key:
+        cached_response = get_response_cache().get(cache_key)
+        if cached_response is not None:
+            return GeminiResult(value=cached_response, cached=True)
+
+    if not single_flight:
+        return _call_model(formatted_history, request_config, response_schema, cache_key, priority)
+    result, shared = get_single_flight().do(
+        request_key, lambda: _call_model(formatted_history, request_config, response_schema, cache_key, priority))
+    if shared:
+        return GeminiResult(value=result.value, error=result.error, coalesced=True)
+    return result
+
+
+def get_gemini_response(prompt_or_history, is_history=True, generation_config=None, response_schema=None,
+                        preferred_language="English", cache=False, raise_errors=False, priority=PRIORITY_CANDIDATE,
+                        single_flight=True, call_site=UNSPECIFIED_CALL_SITE, timeline=None):
+    # cache=True opts a call site into the shared response cache; only use it for prompts whose
+    # answer is fully determined by the inputs (boilerplate transitions, validators, extractors).
+    # raise_errors=True raises instead of returning FALLBACK_REPLY, for callers that store the result.
+    result = generate_gemini(prompt_or_history, is_history=is_history, generation_config=generation_config,
+                             response_schema=response_schema, preferred_language=preferred_language, cache=cache,
+                             priority=priority, single_flight=single_flight, call_site=call_site,
+                             timeline=timeline)
+    if result.ok:
+        return result.value
+    if raise_errors:
+        raise result.error
+    return FALLBACK_REPLY
+
+
+def stream_gemini_response(prompt_or_history, is_history=True, generation_config=None,
+                           preferred_language="English", cache=False, raise_errors=False,
+                           priority=PRIORITY_CANDIDATE, call_site=UNSPECIFIED_CALL_SITE, timeline=None):
+    # Yields text chunks as they arrive, for st.write_stream. JSON-schema calls are never streamed
+    # (a partial JSON object is useless to the caller); use get_gemini_response with response_schema.
+    # Retries only happen before the first chunk; a stream that fails midway ends with FALLBACK_REPLY, or raises
+    # (after the chunks already yielded) with raise_errors=True.
+    # The call is recorded when the stream ends, including when the consumer stops reading early.
+    started = time.monotonic()
+    result = GeminiResult()
+    first_byte_at = None
+    try:
+        for chunk_text in _stream_gemini(prompt_or_history, is_history, generation_config, preferred_language, cache,
+                                         priority, result, raise_errors):
+            if first_byte_at is None:
+                first_byte_at = time.monotonic()
+            yield chunk_text
+    finally:
+        _record_call(call_site, started, first_byte_at, result, True, timeline)
+
+
+def _stream_gemini(prompt_or_history, is_history, generation_config, preferred_language, cache, priority, result,
+                   raise_errors):
+    # Fills in result (attempts, tokens, error, cached) as it goes
+    formatted_history, request_config = build_gemini_request(prompt_or_history, is_history, generation_config,
+                                                             None, preferred_language)
+
+    cache_key = None
+    if cache:
+        cache_key = make_cache_key(get_model_name(), formatted_history, preferred_language,
+                                   generation_config=request_config)
+        cached_response = get_response_cache().get(cache_key)
+        if cached_response is not None:
+            result.cached = True
+            yield cached_response
+            return
+
+    estimated_tokens = estimate_request_tokens(formatted_history)
+    chunks = []
+    while True:
+        result.attempts += 1
+        result.rate_limit_wait_seconds += get_rate_limiter().acquire(estimated_tokens, priority=priority)
+        last_chunk = None
+        try:
+            for chunk in get_model().generate_content(formatted_history, generation_config=request_config,
+                                                      stream=True):
+                last_chunk = chunk
+                try:
+                    chunk_text = chunk.text
+                except ValueError:  # Chunks carrying only finish/safety metadata have no text part
+                    continue
+                if chunk_text:
+                    chunks.append(chunk_text)
+                    yield chunk_text
+        except Exception as e:
+            _release_tokens(last_chunk, estimated_tokens)
+            if not chunks and result.attempts < MAX_ATTEMPTS and is_retryable_error(e):
+                time.sleep(backoff_seconds(result.attempts))
+                continue
+            print(f"Error calling Gemini API (attempt {result.attempts}): {e}")
+            result.error = e
+            if raise_errors:
+                raise
+            yield ("\n\n" if chunks else "") + FALLBACK_REPLY
+            return
+        _settle_tokens(last_chunk, estimated_tokens)  # Streamed chunks carry the running usage totals
+        result.input_tokens, result.output_tokens = usage_tokens(last_chunk)
+        break
+
+    if not chunks:
+        print("No text received from streamed response.")
+        result.error = GeminiResponseError("No text received from streamed response.")
+        if raise_errors:
+            raise result.error
+        yield FALLBACK_REPLY
+        return
+    if cache_key:
+        get_response_cache().set(cache_key, "".join(chunks))
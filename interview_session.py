@@ -0,0 +1,952 @@
+"""Headless screening interview: the chat state machine behind the Streamlit pages (no Streamlit imports here).
+
+Stages: greeting -> start_screening -> generate_technical_questions -> ask_technical_questions
+-> conclude_interview (or ended when no questions could be prepared). app.py renders one InterviewSession
+per browser session; scripts and benchmarks drive it directly through step().
+"""
+import copy
+import hashlib
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import gemini_client
+from conversation_context import ConversationContext
+from job_titles import TITLE_AMBIGUOUS, TITLE_VALID, get_title_index
+from message_catalog import render_message
+from question_bank import build_question_gen_prompt, get_question_bank, parse_numbered_questions
+from rate_limiter import PRIORITY_BACKGROUND
+from resume_ingest import ResumeError, resume_content_hash, submit_resume_ingestion
+from sentiment import analyze_sentiment
+from session_store import EVENT_MESSAGE, EVENT_REPORT, EVENT_STATE, new_resume_token
+from tech_dictionary import dedupe_techs, get_tech_matcher
+
+MAX_TECHS_FOR_QUESTIONS = 5  # Limit to 5 technologies for questions
+MIN_QUESTIONS_PER_TECH = 2
+QUESTIONS_PER_TECH_FROM_BANK = 3
+# The bank keeps growing for a tech until it holds this many questions, so candidates don't share a fixed set
+QUESTION_BANK_POOL_PER_TECH = QUESTIONS_PER_TECH_FROM_BANK * 3
+QUESTION_GEN_MAX_WORKERS = 10  # Upper bound on concurrent Gemini calls while generating questions
+ANSWER_EVALUATION_MAX_WORKERS = 8  # AI detection/sentiment and report digests
+# Sessions whose questions can be generated ahead of the chat at once; sized for the expected number of candidates
+# submitting the form together. A session whose prefetch is still queued when it needs the questions generates
+# them itself, so the cap never adds latency.
+QUESTION_PREFETCH_MAX_WORKERS = 32
+
+PERSISTED_SESSION_ATTRS = ("stage", "awaiting_elaboration", "last_question_for_elaboration")
+CONVERSATION_ENDING_KEYWORDS = ["bye", "exit", "quit", "thank you", "end conversation", "done", "finish", "stop"]
+
+
+def new_candidate_info():
+    return {
+        "full_name": None,
+        "email": None,
+        "phone_number": None,
+        "country_code": None,
+        "years_experience": None,
+        "desired_positions": None,
+        "current_location": None,
+        "tech_stack": [],
+        "technical_questions_generated": [],
+        "current_question_index": 0,
+        "technical_Youtubes": {},
+        "technical_answer_ai_detection": {},
+        "technical_answer_sentiment": {},
+        "technical_answer_digests": {},  # question text -> compact digest for the hiring report
+        "tech_stack_to_question": {},
+        "preferred_language": "English",
+        "resume_uploaded": False,  # Track resume upload status
+        "resume_file_name": None,
+        "resume_techs": [],  # Technologies found on the uploaded resume
+        "linkedin_profile": None,
+        "current_company": None
+    }
+
+
+class GeminiBackend:
+    # Default LLM backend. Anything with the same two methods (same keyword arguments as
+    # gemini_client.get_gemini_response / stream_gemini_response, including call_site) can be passed to
+    # InterviewSession instead.
+
+    def __init__(self, timeline=None):
+        self.timeline = timeline  # Optional list that gets one event per model call (see call_metrics)
+
+    def get_response(self, prompt_or_history, **kwargs):
+        if self.timeline is not None:
+            kwargs.setdefault("timeline", self.timeline)
+        return gemini_client.get_gemini_response(prompt_or_history, **kwargs)
+
+    def stream_response(self, prompt_or_history, **kwargs):
+        if self.timeline is not None:
+            kwargs.setdefault("timeline", self.timeline)
+        return gemini_client.stream_gemini_response(prompt_or_history, **kwargs)
+
+
+_default_evaluation_executor = None
+_default_evaluation_executor_lock = threading.Lock()
+
+
+def get_answer_evaluation_executor():
+    # Shared by every session in the process (in the app: across all browser sessions and reruns)
+    global _default_evaluation_executor
+    with _default_evaluation_executor_lock:
+        if _default_evaluation_executor is None:
+            _default_evaluation_executor = ThreadPoolExecutor(max_workers=ANSWER_EVALUATION_MAX_WORKERS,
+                                                              thread_name_prefix="answer-eval")
+        return _default_evaluation_executor
+
+
+_default_prefetch_executor = None
+_default_prefetch_executor_lock = threading.Lock()
+
+
+def get_question_prefetch_executor():
+    # Shared by every session in the process; each job fans out further inside generate_technical_questions
+    global _default_prefetch_executor
+    with _default_prefetch_executor_lock:
+        if _default_prefetch_executor is None:
+            _default_prefetch_executor = ThreadPoolExecutor(max_workers=QUESTION_PREFETCH_MAX_WORKERS,
+                                                            thread_name_prefix="question-prefetch")
+        return _default_prefetch_executor
+
+
+# --- Info Form LLM Validation ---
+
+def normalize_field_input(value):
+    return " ".join(value.split()).casefold()
+
+
+def validate_desired_position(desired_positions, lang, llm):
+    # Known titles and obvious gibberish are decided locally; only ambiguous input goes to the model
+    verdict = get_title_index().classify(desired_positions)
+    if verdict != TITLE_AMBIGUOUS:
+        return verdict == TITLE_VALID
+    validation_prompt_position = f"""
+    You are an AI assistant tasked with validating user input for the "Desired Position" field.
+    Given the user's input, determine if it appears to be a reasonable and relevant job title or type of position.
+    Respond only with "Valid" if the input is reasonable, or "Invalid" if it seems irrelevant, nonsensical, or clearly not a valid job title.
+    Respond in {lang}.
+    Input: "{desired_positions}"
+    Output:
+    """
+    validation_result_position = llm.get_response(validation_prompt_position, is_history=False,
+                                                  preferred_language=lang, cache=True, raise_errors=True,
+                                                  call_site="validate_position").strip()
+    return validation_result_position != "Invalid"
+
+
+def extract_tech_stack(tech_stack_input, lang, llm):
+    # Known technologies come from the local dictionary; only the terms it can't classify go to the model
+    matcher = get_tech_matcher()
+    known_techs, leftovers = matcher.match(tech_stack_input)
+    if not leftovers:
+        return known_techs
+    try:
+        model_techs = extract_tech_stack_with_model(", ".join(leftovers), lang, llm)
+    except Exception as e:
+        if not known_techs:
+            raise
+        print(f"Error classifying {leftovers} with the model; keeping the dictionary matches: {e}")
+        return known_techs
+    return dedupe_techs(known_techs + [matcher.canonical(tech) or tech for tech in model_techs])
+
+
+def extract_tech_stack_with_model(tech_stack_input, lang, llm):
+    tech_stack_prompt = f"""
+    You are an expert AI assistant tasked with identifying and extracting all distinct technologies from a given text.
+    A technology can be a programming language, framework, library, database, tool, or a specific concept/domain within tech.
+    Parse the following text and return a *comma-separated list of ONLY the identified technologies*.
+    Ensure that if a technology is mentioned, it is included. Do not include any conversational filler or extra sentences.
+    If no clear technologies are identified, respond with 'None'.
+    Respond in {lang}.
+    Text: {tech_stack_input.strip()}
+    """
+    parsed_tech_stack_raw = llm.get_response(tech_stack_prompt, is_history=False,
+                                             preferred_language=lang, cache=True, raise_errors=True,
+                                             call_site="extract_tech_stack").strip()
+    if parsed_tech_stack_raw and parsed_tech_stack_raw.lower() != 'none':
+        return [t.strip() for t in parsed_tech_stack_raw.split(',') if t.strip()]
+    return []
+
+
+# --- Per-Turn Answer Evaluation ---
+
+AI_DETECTION_LABELS = ("AI-generated", "Human-like")
+
+ANSWER_TURN_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "acknowledgment": {"type": "STRING"},
+        "needs_elaboration": {"type": "BOOLEAN"},
+        "ai_detection": {"type": "STRING"},
+        "next_step_hint": {"type": "STRING"},
+    },
+    "required": ["acknowledgment", "needs_elaboration", "ai_detection"],
+}
+
+
+def build_acknowledgment_prompt(question_text, candidate_answer, lang):
+    return f"""
+    Given the following technical question and a candidate's response, provide a very brief (1-2 sentences), neutral, and encouraging acknowledgment or transition phrase.
+    If the candidate's response seems brief, generic, or if it doesn't fully address the question, politely prompt them to "elaborate" or "provide more details" at the end of your acknowledgment.
+    Do NOT provide correct answers, evaluate the correctness of the response, or give away solutions. If the response is a clear non-answer (e.g., 'no', 'I don't know', 'skip', 'abc'), acknowledge that politely and suggest moving on.
+    Respond in {lang}.
+
+    Question: {question_text}
+    Candidate Response: {candidate_answer}
+
+    Your acknowledgment/transition:
+    """
+
+
+def build_answer_turn_prompt(question_text, candidate_answer, lang):
+    return f"""
+    You are evaluating a candidate's response to a technical interview question. Return a JSON object with these fields:
+    - "acknowledgment": a very brief (1-2 sentences), neutral, and encouraging acknowledgment or transition phrase, in {lang}.
+      If the response seems brief, generic, or doesn't fully address the question, politely ask the candidate to elaborate or provide more details.
+      Do NOT provide correct answers, evaluate the correctness of the response, or give away solutions. If the response is a clear non-answer (e.g., 'no', 'I don't know', 'skip', 'abc'), acknowledge that politely and suggest moving on.
+    - "needs_elaboration": true only if the acknowledgment asks the candidate to elaborate, otherwise false.
+    - "ai_detection": exactly "AI-generated" if the answer appears to be generated by an AI (e.g., overly formal, generic, comprehensive without natural pauses/hesitations, sounds like a textbook definition), or exactly "Human-like" if it exhibits human-like characteristics (e.g., conversational, potentially less structured, specific examples from experience, some natural imperfection).
+    - "next_step_hint": if needs_elaboration is true, a short phrase in {lang} naming the aspect the candidate should expand on; otherwise an empty string.
+
+    Question: {question_text}
+    Candidate Response: {candidate_answer}
+    """
+
+
+def parse_answer_turn_evaluation(result):
+    # Validates a JSON-mode response against ANSWER_TURN_SCHEMA; returns None if it doesn't conform
+    if not isinstance(result, dict):
+        return None
+    acknowledgment = result.get("acknowledgment")
+    needs_elaboration = result.get("needs_elaboration")
+    if not isinstance(acknowledgment, str) or not acknowledgment.strip() or not isinstance(needs_elaboration, bool):
+        return None
+
+    ai_detection = result.get("ai_detection")
+    if isinstance(ai_detection, str) and ai_detection.strip().rstrip('.') in AI_DETECTION_LABELS:
+        ai_detection = ai_detection.strip().rstrip('.')
+    else:
+        ai_detection = None  # Left to the background evaluator
+    next_step_hint = result.get("next_step_hint")
+    if not isinstance(next_step_hint, str) or not next_step_hint.strip():
+        next_step_hint = None
+    else:
+        next_step_hint = next_step_hint.strip()
+
+    return {"acknowledgment": acknowledgment.strip(), "needs_elaboration": needs_elaboration,
+            "ai_detection": ai_detection, "next_step_hint": next_step_hint, "streamed": False}
+
+
+def evaluate_answer_turn(question_text, candidate_answer, lang, llm, render_stream=None):
+    # render_stream (e.g. st.write_stream) streams the free-text fallback acknowledgment as it is generated;
+    # the structured JSON-mode call itself is never streamed. Returns None only when the model couldn't be
+    # reached (quota, network, server errors), in which case the answer must not be recorded.
+    try:
+        turn_result = llm.get_response(build_answer_turn_prompt(question_text, candidate_answer, lang),
+                                       is_history=False, response_schema=ANSWER_TURN_SCHEMA, preferred_language=lang,
+                                       raise_errors=True, call_site="answer_turn")
+    except gemini_client.GeminiResponseError as e:
+        turn_result = None  # The model replied, just not with usable JSON: fall back to free text below
+        print(f"Warning: Structured answer evaluation returned no usable JSON: {e}")
+    except Exception as e:
+        print(f"Error evaluating answer: {e}")
+        return None
+    turn_evaluation = parse_answer_turn_evaluation(turn_result)
+    if turn_evaluation is not None:
+        return turn_evaluation
+
+    # Fallback: the model didn't return schema-conforming JSON, so ask for a free-text acknowledgment
+    if turn_result is not None:
+        print(f"Warning: Structured answer evaluation failed, falling back to free text: {turn_result}")
+    acknowledgment_prompt = build_acknowledgment_prompt(question_text, candidate_answer, lang)
+    try:
+        if render_stream is not None:
+            acknowledgment = render_stream(llm.stream_response(acknowledgment_prompt, is_history=False,
+                                                               preferred_language=lang, raise_errors=True,
+                                                               call_site="acknowledgment")).strip()
+        else:
+            acknowledgment = llm.get_response(acknowledgment_prompt, is_history=False, preferred_language=lang,
+                                              raise_errors=True, call_site="acknowledgment").strip()
+    except gemini_client.GeminiResponseError as e:
+        # A blocked or empty reply won't change on a resend; record the answer and move on without one
+        print(f"Warning: No acknowledgment generated: {e}")
+        acknowledgment = ""
+    except Exception as e:
+        print(f"Error generating acknowledgment: {e}")
+        return None
+    needs_elaboration = "?" in acknowledgment or any(
+        word in acknowledgment.lower() for word in ["elaborate", "further", "more details", "can you tell me"])
+    return {"acknowledgment": acknowledgment, "needs_elaboration": needs_elaboration,
+            "ai_detection": None, "next_step_hint": None, "streamed": render_stream is not None}
+
+
+def evaluate_answer(question_text, candidate_answer, lang, llm, ai_detection=None):
+    # Runs on a worker thread, so it only reads its arguments
+    if ai_detection is not None:  # Already labelled by the structured per-turn evaluation
+        return {"ai_detection": ai_detection, "sentiment": analyze_sentiment(candidate_answer)}
+
+    ai_detection_prompt = f"""
+    Analyze the following candidate's answer to a technical question. Determine if the answer appears to be generated by an AI (e.g., overly formal, generic, comprehensive without natural pauses/hesitations, sounds like a textbook definition) or if it exhibits human-like characteristics (e.g., conversational, potentially less structured, specific examples from experience, some natural imperfection).
+    Respond only with "AI-generated" or "Human-like".
+    Respond in {lang}.
+
+    Question: {question_text}
+    Candidate Answer: {candidate_answer}
+    """
+    try:
+        ai_detection_result = llm.get_response(ai_detection_prompt, is_history=False, preferred_language=lang,
+                                               raise_errors=True, priority=PRIORITY_BACKGROUND,
+                                               call_site="ai_detection")
+        ai_detection_result = ai_detection_result.strip().replace('.', '')
+    except Exception as e:
+        print(f"Error detecting AI-generated answer: {e}")
+        ai_detection_result = "N/A"  # Never store an error message as a label
+    return {"ai_detection": ai_detection_result, "sentiment": analyze_sentiment(candidate_answer)}
+
+
+# --- Answer Digests ---
+
+ANSWER_DIGEST_LEVELS = {"depth": ("Shallow", "Adequate", "Deep"), "engagement": ("Low", "Medium", "High")}
+ANSWER_DIGEST_MAX_CHARS = 160  # Per free-text digest field, so the report prompt stays small however long the answer
+REPORT_QUESTION_MAX_CHARS = 160
+# Answers without a digest are quoted up to this length; answers no longer than this aren't digested at all,
+# since quoting them costs the report no more than a digest would
+REPORT_ANSWER_FALLBACK_MAX_CHARS = 400
+
+ANSWER_DIGEST_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "depth": {"type": "STRING", "enum": list(ANSWER_DIGEST_LEVELS["depth"])},
+        "engagement": {"type": "STRING", "enum": list(ANSWER_DIGEST_LEVELS["engagement"])},
+        "strengths": {"type": "STRING"},
+        "gaps": {"type": "STRING"},
+    },
+    "required": ["depth", "engagement", "strengths", "gaps"],
+}
+
+
+def truncate_text(text, max_chars):
+    text = " ".join(str(text).split())
+    return text if len(text) <= max_chars else text[:max_chars].rstrip() + "…"
+
+
+def build_answer_digest_prompt(question_text, candidate_answer, years_exp, lang):
+    return f"""
+    You are reviewing one answer from a technical screening of a candidate with {years_exp} years of experience.
+    Write a compact digest for the hiring manager, who will see only this digest and not the answer. Do not evaluate correctness, only perceived depth, effort and engagement.
+    - depth: "Shallow", "Adequate" or "Deep"
+    - engagement: "Low", "Medium" or "High"
+    - strengths: the notable strengths shown, in at most 15 words
+    - gaps: the notable gaps or missing detail, in at most 15 words ("None" if there are none)
+    Write strengths and gaps in {lang}.
+
+    Question: {question_text}
+    Candidate Answer: {candidate_answer}
+    """
+
+
+def parse_answer_digest(result):
+    # Validates a JSON-mode response against ANSWER_DIGEST_SCHEMA; returns None if it doesn't conform
+    if not isinstance(result, dict):
+        return None
+    digest = {}
+    for field, levels in ANSWER_DIGEST_LEVELS.items():
+        value = result.get(field)
+        if not isinstance(value, str) or value.strip().capitalize() not in levels:
+            return None
+        digest[field] = value.strip().capitalize()
+    for field in ("strengths", "gaps"):
+        value = result.get(field)
+        if not isinstance(value, str) or not value.strip():
+            return None
+        digest[field] = truncate_text(value, ANSWER_DIGEST_MAX_CHARS)
+    return digest
+
+
+def digest_answer(question_text, candidate_answer, years_exp, lang, llm):
+    # Runs on a worker thread once the answer is final (after any elaboration). Raises if no digest came back.
+    result = llm.get_response(build_answer_digest_prompt(question_text, candidate_answer, years_exp, lang),
+                              is_history=False, response_schema=ANSWER_DIGEST_SCHEMA, preferred_language=lang,
+                              raise_errors=True, priority=PRIORITY_BACKGROUND, call_site="answer_digest")
+    digest = parse_answer_digest(result)
+    if digest is None:
+        raise ValueError(f"Answer digest doesn't match the schema: {result!r}")
+    return digest
+
+
+# --- Technical Question Generation ---
+
+def generate_technical_questions(techs, years_exp, lang, llm, bank=None):
+    # Techs whose bank pool is full are served from it (randomized, no repeats). The rest get freshly generated
+    # questions, fanned out over a bounded thread pool so generation costs roughly one model round trip instead
+    # of one per technology, and written back to the bank until its pool is full.
+    # Returns {tech: [questions]} in the same order as `techs`; techs that fail are left out.
+    techs = list(dict.fromkeys(techs))  # De-duplicate while keeping the candidate's order
+    if not techs:
+        return {}
+
+    bank = bank or get_question_bank()
+    questions_by_tech = {tech: bank.sample(tech, years_exp, lang, QUESTIONS_PER_TECH_FROM_BANK) for tech in techs}
+    llm_techs = [tech for tech in techs if bank.count(tech, years_exp, lang) < QUESTION_BANK_POOL_PER_TECH]
+    if not llm_techs:
+        return questions_by_tech
+
+    max_workers = min(QUESTION_GEN_MAX_WORKERS, len(llm_techs) * MIN_QUESTIONS_PER_TECH)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="question-gen") as executor:
+        futures = [
+            executor.submit(llm.get_response, build_question_gen_prompt(tech, years_exp, lang),
+                            is_history=False, preferred_language=lang, raise_errors=True,
+                            call_site="question_generation")
+            for tech in llm_techs
+        ]
+        for tech, future in zip(llm_techs, futures):
+            try:
+                generated_questions = parse_numbered_questions(future.result())
+            except Exception as e:
+                print(f"Error generating questions for {tech}: {e}")
+                continue
+            if generated_questions:
+                # Sampled from the bank before these were added, so they can't overlap
+                questions_by_tech[tech] = (generated_questions + questions_by_tech[tech])[:QUESTIONS_PER_TECH_FROM_BANK]
+                bank.add(tech, years_exp, lang, generated_questions)
+
+        # Ensure at least MIN_QUESTIONS_PER_TECH questions per tech, from the bank first and then the model; all
+        # top-ups run in a single round. A tech's top-up prompts are identical, so they opt out of single-flight
+        # to get distinct questions.
+        for tech in llm_techs:
+            missing = MIN_QUESTIONS_PER_TECH - len(questions_by_tech[tech])
+            if missing > 0:
+                questions_by_tech[tech] += bank.sample(tech, years_exp, lang, missing, exclude=questions_by_tech[tech])
+        top_up_futures = [
+            (tech, executor.submit(
+                llm.get_response,
+                f"Generate a general question about {tech} for someone with {years_exp} years of experience.",
+                is_history=False, preferred_language=lang, raise_errors=True, single_flight=False,
+                call_site="question_top_up"))
+            for tech in llm_techs
+            for _ in range(MIN_QUESTIONS_PER_TECH - len(questions_by_tech[tech]))
+        ]
+        for tech, future in top_up_futures:
+            try:
+                top_up_question = future.result().strip()
+            except Exception as e:
+                print(f"Error generating top-up question for {tech}: {e}")
+                continue
+            if top_up_question:
+                bank.add(tech, years_exp, lang, [top_up_question])
+                questions_by_tech[tech].append(top_up_question)
+
+    bank.save()
+    return {tech: questions for tech, questions in questions_by_tech.items() if questions}
+
+
+# --- Hiring Recommendation Report ---
+
+def build_report_prompt(info):
+    report_prompt = f"""
+    You are an AI Hiring Manager. Based on the following candidate's profile and their performance in a technical screening, provide a concise hiring recommendation.
+    Your recommendation should include:
+    1. A clear "Hire", "Do Not Hire", or "Maybe" verdict.
+    2. A brief justification for the verdict, considering:
+       - Completeness and clarity of provided personal information.
+       - Relevance of their experience and desired role to their tech stack.
+       - Overall perceived quality and depth of their technical answers (DO NOT evaluate correctness, only perceived effort/engagement).
+       - General sentiment from their technical answers.
+       - Any red flags (e.g., consistently generic/AI-generated answers, lack of engagement).
+       - Consideration of their years of experience and if the answers align with it.
+    3. A summary of their strengths and areas for potential development based on the technical answers.
+
+    Maintain a professional and objective tone.
+
+    Candidate Information:
+    Name: {info['full_name']}
+    Email: {info['email']}
+    Phone: {info['phone_number']}
+    Current Company: {info['current_company']}
+    Years of Experience: {info['years_experience']}
+    Desired Positions: {info['desired_positions']}
+    Location: {info['current_location']}
+    Tech Stack: {', '.join(info['tech_stack'])}
+    Resume Uploaded: {info['resume_uploaded']}
+    Technologies on Resume: {', '.join(info.get('resume_techs') or []) or 'N/A'}
+    LinkedIn Profile: {info['linkedin_profile'] if info['linkedin_profile'] else 'N/A'}
+
+    Technical Questions and Answer Digests (depth, engagement, strengths and gaps of each answer; an answer is quoted only where no digest is available):
+    """
+    digests = info.get("technical_answer_digests", {})
+    for q, a in info["technical_Youtubes"].items():
+        ai_detect = info["technical_answer_ai_detection"].get(q, 'N/A')
+        sentiment = info["technical_answer_sentiment"].get(q, 'N/A')
+        digest = digests.get(q)
+        report_prompt += f"\n- Q: {truncate_text(q, REPORT_QUESTION_MAX_CHARS)}\n"
+        if digest:
+            report_prompt += (f"  Depth: {digest['depth']}, Engagement: {digest['engagement']}\n"
+                              f"  Strengths: {digest['strengths']}\n  Gaps: {digest['gaps']}\n")
+        else:
+            report_prompt += f"  A: {truncate_text(a, REPORT_ANSWER_FALLBACK_MAX_CHARS)}\n"
+        report_prompt += f"  AI Detection: {ai_detect}, Sentiment: {sentiment}\n"
+
+    all_sentiments = [s for s in info["technical_answer_sentiment"].values() if s != 'N/A']
+    if all_sentiments:
+        positive_count = all_sentiments.count("Positive 😊")
+        negative_count = all_sentiments.count("Negative 😞")
+        neutral_count = all_sentiments.count("Neutral 😐")
+        report_prompt += f"\nOverall sentiment of technical answers: Positive ({positive_count}), Negative ({negative_count}), Neutral ({neutral_count})."
+    else:
+        report_prompt += "\nOverall sentiment of technical answers: Not enough data."
+
+    report_prompt += "\n\nHiring Recommendation Report:"
+
+    return report_prompt
+
+
+def get_report_cache_key(info):
+    # Content hash of everything the report prompt is built from
+    report_inputs = {field: info.get(field) for field in (
+        "full_name", "email", "phone_number", "current_company", "years_experience", "desired_positions",
+        "current_location", "tech_stack", "resume_uploaded", "resume_techs", "linkedin_profile",
+        "preferred_language",
+        "technical_Youtubes", "technical_answer_ai_detection", "technical_answer_sentiment",
+        "technical_answer_digests")}
+    serialized = json.dumps(report_inputs, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+# --- Interview Session ---
+
+class InterviewSession:
+    # One candidate's screening. Not thread-safe: drive each session from one thread at a time (background
+    # answer evaluations only hand results back through collect_answer_evaluations).
+
+    def __init__(self, llm=None, question_bank=None, evaluation_executor=None, record_timeline=False, store=None):
+        # record_timeline keeps a per-session list of model calls (call site, timings, tokens) in self.timeline;
+        # it applies to the default backend only
+        self.timeline = [] if record_timeline else None
+        self.llm = llm or GeminiBackend(timeline=self.timeline)
+        self.question_bank = question_bank  # None -> the process-wide bank
+        self.evaluation_executor = evaluation_executor  # None -> the process-wide answer-eval pool
+        self.store = store  # session_store.SessionStore, or None to keep the session in memory only
+        self.resume_token = None  # Assigned on the first write to the store
+        self._persisted_message_count = 0
+        self._persisted_state = {"session": {}, "candidate_info": {}}
+        self._persisted_report_keys = set()
+        self.candidate_info = new_candidate_info()
+        self.messages = []
+        self.stage = "greeting"
+        self.awaiting_elaboration = False
+        self.last_question_for_elaboration = None
+        self.form_llm_check_memo = {}  # (field, normalized input, language) -> LLM check result
+        self.pending_evaluations = {}  # question text -> Future for AI detection/sentiment
+        self.pending_digests = {}  # question text -> Future for the answer's report digest
+        self.question_prefetch = None  # (generation inputs, Future) started when the info form is accepted
+        self.resume_ingestion = None  # (content hash, Future) for the latest uploaded resume
+        self.resume_error = None  # Why the latest resume couldn't be read, for the candidate
+        self.hiring_reports = {}  # report content hash -> generated hiring recommendation
+        self.conversation_context = ConversationContext()  # Bounded history for free-chat turns
+
+    @classmethod
+    def resume(cls, token, store, **kwargs):
+        # Rebuilds a stored session from its event log; None for an unknown token. Answers whose background
+        # evaluation hadn't been stored yet are evaluated again.
+        state = store.load_state(token)
+        if state is None:
+            return None
+        session = cls(store=store, **kwargs)
+        session.resume_token = token
+        session.messages = state["messages"]
+        session.candidate_info.update(state["candidate_info"])
+        for attr in PERSISTED_SESSION_ATTRS:
+            if attr in state["session"]:
+                setattr(session, attr, state["session"][attr])
+        session.hiring_reports = state["hiring_reports"]
+        session._persisted_message_count = len(session.messages)
+        session._persisted_state = session._state_to_persist()
+        session._persisted_report_keys = set(session.hiring_reports)
+
+        info = session.candidate_info
+        for question_text, candidate_answer in info["technical_Youtubes"].items():
+            if question_text not in info["technical_answer_ai_detection"]:
+                session.submit_answer_evaluation(question_text, candidate_answer)
+            answer_is_final = not (session.awaiting_elaboration and
+                                   question_text == session.last_question_for_elaboration)
+            if answer_is_final and question_text not in info["technical_answer_digests"]:
+                session.submit_answer_digest(question_text)
+        return session
+
+    @property
+    def lang(self):
+        return self.candidate_info["preferred_language"]
+
+    def snapshot(self):
+        # The parts of the state a turn can change; step() reports the difference as its state diff
+        info = self.candidate_info
+        return {
+            "stage": self.stage,
+            "awaiting_elaboration": self.awaiting_elaboration,
+            "last_question_for_elaboration": self.last_question_for_elaboration,
+            "current_question_index": info["current_question_index"],
+            "technical_questions_generated": list(info["technical_questions_generated"]),
+            "tech_stack_to_question": dict(info["tech_stack_to_question"]),
+            "technical_Youtubes": dict(info["technical_Youtubes"]),
+        }
+
+    # --- Info Form ---
+
+    def run_form_llm_checks(self, checks):
+        # checks: {field_name: (check_fn, raw_value)}, check_fn(value, lang, llm). Results are memoized per
+        # session by normalized input, so resubmitting the form after fixing an unrelated field costs no model calls.
+        # A check whose model call failed comes back as None and isn't memoized, so the next submit retries it.
+        memo = self.form_llm_check_memo
+        lang = self.lang
+        results = {}
+        pending = {}
+        for field, (check_fn, value) in checks.items():
+            memo_key = (field, normalize_field_input(value), lang)
+            if memo_key in memo:
+                results[field] = memo[memo_key]
+            else:
+                pending[field] = (memo_key, check_fn, value)
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=len(pending), thread_name_prefix="form-check") as executor:
+                futures = {field: executor.submit(check_fn, value, lang, self.llm)
+                           for field, (_, check_fn, value) in pending.items()}
+                for field, future in futures.items():
+                    try:
+                        results[field] = future.result()
+                    except Exception as e:
+                        print(f"Error running form check for {field}: {e}")
+                        results[field] = None
+                        continue
+                    memo[pending[field][0]] = results[field]
+        return results
+
+    def start_resume_ingestion(self, data, file_name):
+        # Parsing and tech detection run in the background; re-uploading the file being processed is a no-op.
+        # Resume prose is mostly not technologies, so detection is dictionary-only: no model call per upload.
+        content_hash = resume_content_hash(data)
+        if self.resume_ingestion is not None and self.resume_ingestion[0] == content_hash:
+            return
+        self.resume_error = None
+        self.resume_ingestion = (content_hash, submit_resume_ingestion(
+            data, file_name, self.lang, lambda text, lang: get_tech_matcher().match(text, prose=True)[0]))
+
+    def collect_resume_ingestion(self, wait=False):
+        # Moves a finished ingestion into candidate_info (or resume_error). Returns True while one is still running.
+        if self.resume_ingestion is None:
+            return False
+        future = self.resume_ingestion[1]
+        if not wait and not future.done():
+            return True
+        self.resume_ingestion = None
+        try:
+            resume = future.result()
+        except ResumeError as e:
+            self.resume_error = str(e)
+            return False
+        except Exception as e:
+            print(f"Error ingesting resume: {e}")
+            self.resume_error = "We couldn't read your resume right now. Please try uploading it again."
+            return False
+        self.candidate_info.update(resume_uploaded=True, resume_file_name=resume["file_name"],
+                                   resume_techs=resume["techs"])
+        return False
+
+    def submit_candidate_info(self, **fields):
+        self.candidate_info.update(fields)
+        self.stage = "start_screening"
+        self._start_question_prefetch()
+        self._persist()
+
+    def _question_generation_inputs(self):
+        info = self.candidate_info
+        return tuple(info["tech_stack"][:MAX_TECHS_FOR_QUESTIONS]), info["years_experience"], self.lang
+
+    def _start_question_prefetch(self):
+        # Everything question generation needs is known once the form is accepted, so it runs while the chat
+        # page loads and the greeting is shown instead of behind the candidate's first message
+        techs, years_exp, lang = inputs = self._question_generation_inputs()
+        if not techs:
+            self.question_prefetch = None
+            return
+        future = get_question_prefetch_executor().submit(generate_technical_questions, list(techs), years_exp, lang,
+                                                         self.llm, self.question_bank)
+        self.question_prefetch = (inputs, future)
+
+    def _generate_questions(self):
+        # The prefetched questions if they were generated for the current inputs, otherwise generated now
+        prefetch, self.question_prefetch = self.question_prefetch, None
+        techs, years_exp, lang = inputs = self._question_generation_inputs()
+        # A prefetch that hasn't started (the pool is busy with other sessions) is cancelled, not waited on
+        if prefetch is not None and not prefetch[1].cancel() and prefetch[0] == inputs:
+            try:
+                return prefetch[1].result()
+            except Exception as e:
+                print(f"Error prefetching technical questions, generating them again: {e}")
+        return generate_technical_questions(list(techs), years_exp, lang, self.llm, bank=self.question_bank)
+
+    # --- Chat ---
+
+    def start_screening(self):
+        greeting_message = f"👋 Hi {self.candidate_info['full_name']}, thanks for applying! Let's dive into your tech expertise. I'll now ask you some technical questions based on your skills."
+        self.messages.append({"role": "assistant", "content": greeting_message})
+        self.stage = "generate_technical_questions"
+        self._persist()
+        return greeting_message
+
+    def ask_first_question(self):
+        # Follows the greeting with the first question (or the reason there is none) without waiting for a
+        # candidate message; blocks only for whatever part of the question prefetch is still running
+        if self.stage != "generate_technical_questions":
+            return ""
+        reply = self._prepare_questions()
+        self.messages.append({"role": "assistant", "content": reply})
+        self._persist()
+        return reply
+
+    def step(self, user_input, render_stream=None):
+        # Processes one candidate message. Returns {"reply", "streamed_text", "stage", "changes"}: streamed_text is
+        # the leading part of reply already shown through render_stream, and changes maps each snapshot()
+        # field that this turn changed to its new value. An empty reply with stage "conclude_interview"
+        # means the candidate ended the interview.
+        before = self.snapshot()
+        self.messages.append({"role": "user", "content": user_input})
+
+        if any(keyword in user_input.lower() for keyword in CONVERSATION_ENDING_KEYWORDS):
+            self.stage = "conclude_interview"
+
+        streamed_text = ""
+        if self.stage == "generate_technical_questions":
+            reply = self._prepare_questions()
+        elif self.stage == "ask_technical_questions":
+            reply, streamed_text = self._answer_question(user_input.strip(), render_stream)
+        elif self.stage == "conclude_interview":
+            reply = ""  # Nothing to say; the caller moves on to the report
+        else:
+            reply, streamed_text = self._free_chat(render_stream)
+
+        if reply:
+            self.messages.append({"role": "assistant", "content": reply})
+        after = self.snapshot()
+        self._persist()
+        return {"reply": reply, "streamed_text": streamed_text, "stage": self.stage,
+                "changes": {field: value for field, value in after.items() if before[field] != value}}
+
+    def _prepare_questions(self):
+        info = self.candidate_info
+        info["technical_questions_generated"] = []
+        info["current_question_index"] = 0
+        info["tech_stack_to_question"] = {}
+
+        if not info["tech_stack"]:
+            self.stage = "ended"
+            return render_message("no_technologies", self.lang, get_response=self.llm.get_response)
+
+        questions_by_tech = self._generate_questions()
+        for tech, cleaned_questions in questions_by_tech.items():
+            info["tech_stack_to_question"][tech] = cleaned_questions
+            info["technical_questions_generated"].extend([f"{tech}** - {q}" for q in cleaned_questions])
+
+        if not info["technical_questions_generated"]:
+            self.stage = "ended"
+            return render_message("questions_unavailable", self.lang, get_response=self.llm.get_response)
+        self.stage = "ask_technical_questions"
+        first_question = info["technical_questions_generated"][0]
+        return f"Great! Let's start with the technical questions.\n\nQuestion {info['current_question_index'] + 1}: {first_question}"
+
+    def _answer_question(self, candidate_answer, render_stream):
+        info = self.candidate_info
+        question_text = info["technical_questions_generated"][info["current_question_index"]]
+
+        if self.awaiting_elaboration:
+            last_q_for_elaboration = self.last_question_for_elaboration
+            if last_q_for_elaboration and last_q_for_elaboration in info["technical_Youtubes"]:
+                info["technical_Youtubes"][last_q_for_elaboration] += "\n\n(Elaboration): " + candidate_answer
+                self.submit_answer_digest(last_q_for_elaboration)
+            else:
+                print(f"Warning: Elaboration received but last_question_for_elaboration was not found: {last_q_for_elaboration}")
+                info["technical_Youtubes"][question_text] = candidate_answer  # Fallback to current question
+                self.submit_answer_digest(question_text)
+            self.awaiting_elaboration = False
+            self.last_question_for_elaboration = None
+
+            info["current_question_index"] += 1
+            next_q_index = info["current_question_index"]
+            if next_q_index < len(info["technical_questions_generated"]):
+                next_question = info["technical_questions_generated"][next_q_index]
+                return (render_message("elaboration_next_question", self.lang, get_response=self.llm.get_response)
+                        + f"\n\nQuestion {next_q_index + 1}: {next_question}"), ""
+            self.stage = "conclude_interview"
+            return render_message("elaboration_all_collected", self.lang, get_response=self.llm.get_response), ""
+
+        # Normal question answering flow
+        # One structured call returns the acknowledgment, the elaboration flag and the AI-detection label;
+        # sentiment (and AI detection, if the structured call fell back to free text) is scored off the critical path.
+        turn_evaluation = evaluate_answer_turn(question_text, candidate_answer, self.lang, self.llm,
+                                               render_stream=render_stream)
+        if turn_evaluation is None:
+            # The model is unavailable: keep the candidate on this question, with nothing recorded
+            return render_message("answer_not_processed", self.lang, get_response=self.llm.get_response), ""
+        info["technical_Youtubes"][question_text] = candidate_answer
+        self.submit_answer_evaluation(question_text, candidate_answer, ai_detection=turn_evaluation["ai_detection"])
+
+        acknowledgment = turn_evaluation["acknowledgment"]
+        streamed_text = acknowledgment if turn_evaluation["streamed"] else ""
+        is_elaboration_request = turn_evaluation["needs_elaboration"]
+        if is_elaboration_request and turn_evaluation["next_step_hint"]:
+            acknowledgment += f"\n\n_Hint: {turn_evaluation['next_step_hint']}_"
+        response_text_parts = [acknowledgment, "\n---\n"]
+
+        if is_elaboration_request:
+            self.awaiting_elaboration = True
+            self.last_question_for_elaboration = question_text
+        else:
+            self.submit_answer_digest(question_text)  # The answer is final; digest it for the report
+            info["current_question_index"] += 1
+            next_q_index = info["current_question_index"]
+            if next_q_index < len(info["technical_questions_generated"]):
+                next_question = info["technical_questions_generated"][next_q_index]
+                response_text_parts.append(f"Question {next_q_index + 1}: {next_question}")
+            else:
+                response_text_parts.append(render_message("all_questions_answered", self.lang,
+                                                          get_response=self.llm.get_response))
+                self.stage = "conclude_interview"
+        return "\n".join(response_text_parts), streamed_text
+
+    def _free_chat(self, render_stream):
+        # Fallback for unexpected conversation stages: continue the conversation from the recent chat history
+        # plus a rolling summary of the rest, so the prompt doesn't grow with the conversation
+        history = self.conversation_context.build(self.messages, self.llm, self.lang)
+        if render_stream is not None:
+            reply = streamed_text = render_stream(self.llm.stream_response(history, is_history=True,
+                                                                           preferred_language=self.lang,
+                                                                           call_site="free_chat"))
+        else:
+            reply = self.llm.get_response(history, is_history=True, preferred_language=self.lang,
+                                          call_site="free_chat")
+            streamed_text = ""
+        if "sorry" in reply.lower() or "understand" in reply.lower():
+            reply += "\n\n" + render_message("chatbot_lost", self.lang, get_response=self.llm.get_response)
+        return reply, streamed_text
+
+    # --- Background Answer Evaluation ---
+
+    def submit_answer_evaluation(self, question_text, candidate_answer, ai_detection=None):
+        executor = self.evaluation_executor or get_answer_evaluation_executor()
+        self.pending_evaluations[question_text] = executor.submit(evaluate_answer, question_text, candidate_answer,
+                                                                  self.lang, self.llm, ai_detection)
+
+    def submit_answer_digest(self, question_text):
+        info = self.candidate_info
+        if len(info["technical_Youtubes"][question_text]) <= REPORT_ANSWER_FALLBACK_MAX_CHARS:
+            return
+        executor = self.evaluation_executor or get_answer_evaluation_executor()
+        self.pending_digests[question_text] = executor.submit(digest_answer, question_text,
+                                                              info["technical_Youtubes"][question_text],
+                                                              info["years_experience"], self.lang, self.llm)
+
+    def collect_answer_evaluations(self, wait=False):
+        # Moves finished background evaluations and digests into candidate_info; with wait=True, blocks until
+        # all are done
+        collected = False
+        for question_text, future in list(self.pending_digests.items()):
+            if not wait and not future.done():
+                continue
+            try:
+                self.candidate_info["technical_answer_digests"][question_text] = future.result()
+            except Exception as e:
+                # The report quotes the (truncated) answer instead
+                print(f"Error digesting answer for '{question_text}': {e}")
+            del self.pending_digests[question_text]
+            collected = True
+        for question_text, future in list(self.pending_evaluations.items()):
+            if not wait and not future.done():
+                continue
+            try:
+                evaluation = future.result()
+            except Exception as e:
+                print(f"Error evaluating answer for '{question_text}': {e}")
+                evaluation = {"ai_detection": "N/A", "sentiment": "N/A"}
+            self.candidate_info["technical_answer_ai_detection"][question_text] = evaluation["ai_detection"]
+            self.candidate_info["technical_answer_sentiment"][question_text] = evaluation["sentiment"]
+            del self.pending_evaluations[question_text]
+            collected = True
+        if collected:
+            self._persist()
+
+    # --- Hiring Recommendation Report ---
+
+    def has_hiring_report(self):
+        return get_report_cache_key(self.candidate_info) in self.hiring_reports
+
+    def get_hiring_report(self, render_stream=None):
+        # Generated once per distinct interview content, from the per-answer digests built in the background
+        # as the interview went on; waits for any that are still pending first. None if generation failed.
+        self.collect_answer_evaluations(wait=True)  # The report needs every digest and AI-detection/sentiment label
+        report_key = get_report_cache_key(self.candidate_info)
+        if report_key not in self.hiring_reports:
+            report_prompt = build_report_prompt(self.candidate_info)
+            try:
+                if render_stream is not None:
+                    hiring_report = render_stream(self.llm.stream_response(report_prompt, is_history=False,
+                                                                           preferred_language=self.lang,
+                                                                           raise_errors=True,
+                                                                           call_site="hiring_report"))
+                else:
+                    hiring_report = self.llm.get_response(report_prompt, is_history=False,
+                                                          preferred_language=self.lang, raise_errors=True,
+                                                          call_site="hiring_report")
+            except Exception as e:
+                print(f"Error generating hiring report: {e}")
+                return None  # Failed generations aren't kept, so the next view tries again
+            self.hiring_reports[report_key] = hiring_report
+            self._persist()
+        return self.hiring_reports[report_key]
+
+    def discard_hiring_report(self):
+        self.hiring_reports.pop(get_report_cache_key(self.candidate_info), None)
+        self._persist()
+
+    # --- Persistence ---
+
+    def _state_to_persist(self):
+        return {"session": {attr: getattr(self, attr) for attr in PERSISTED_SESSION_ATTRS},
+                "candidate_info": copy.deepcopy(self.candidate_info)}
+
+    def _persist(self):
+        # Appends what changed since the last call to the store (new messages, changed fields, only the new or
+        # changed entries of dict fields, added or discarded reports). The store's writer thread does the I/O.
+        if self.store is None:
+            return
+        if self.resume_token is None:
+            self.resume_token = new_resume_token()
+        for message in self.messages[self._persisted_message_count:]:
+            self.store.append(self.resume_token, EVENT_MESSAGE, message)
+        self._persisted_message_count = len(self.messages)
+
+        current, previous = self._state_to_persist(), self._persisted_state
+        changes = {"session": {}, "candidate_info": {}, "candidate_info_items": {}}
+        for attr, value in current["session"].items():
+            if attr not in previous["session"] or previous["session"][attr] != value:
+                changes["session"][attr] = value
+        for field, value in current["candidate_info"].items():
+            old_value = previous["candidate_info"].get(field)
+            if field in previous["candidate_info"] and old_value == value:
+                continue
+            if isinstance(value, dict) and isinstance(old_value, dict) and old_value.keys() <= value.keys():
+                changes["candidate_info_items"][field] = {key: item for key, item in value.items()
+                                                          if key not in old_value or old_value[key] != item}
+            else:
+                changes["candidate_info"][field] = value
+        changes = {part: fields for part, fields in changes.items() if fields}
+        if changes:
+            self.store.append(self.resume_token, EVENT_STATE, changes, stage=self.stage)
+        self._persisted_state = current
+
+        for report_key in self.hiring_reports.keys() - self._persisted_report_keys:
+            self.store.append(self.resume_token, EVENT_REPORT,
+                              {"key": report_key, "content": self.hiring_reports[report_key]}, completed=True)
+        for report_key in self._persisted_report_keys - self.hiring_reports.keys():
+            self.store.append(self.resume_token, EVENT_REPORT, {"key": report_key, "content": None})
+        self._persisted_report_keys = set(self.hiring_reports)
@@ -0,0 +1,229 @@
+"""Local job-title index for the "Desired Position" field.
+
+Titles are checked word by word against a normalized title vocabulary (roles, fields, seniority) and the
+technology dictionary, with typos corrected by edit distance over a character-trigram index. Well-formed titles
+("Senior Software Engineer", "Data Scientist", "React Developer") are accepted and keyboard mashes ("asdfgh",
+"123") rejected without a model call; anything in between is reported as ambiguous, for the caller to hand to the
+model.
+"""
+import re
+import threading
+
+from tech_dictionary import SEPARATOR_PATTERN, get_tech_matcher
+
+TITLE_VALID = "valid"
+TITLE_INVALID = "invalid"
+TITLE_AMBIGUOUS = "ambiguous"
+
+# The noun that makes a phrase a position ("... Engineer", "... Manager")
+ROLE_WORDS = frozenset("""
+    engineer engineers engineering developer developers dev devs programmer coder scientist analyst architect
+    designer manager management administrator admin consultant specialist tester lead head director officer
+    intern internship trainee apprentice researcher technician coordinator associate executive owner master
+    strategist writer evangelist advocate operator sre sde swe sdet cto cio ciso cfo coo ceo vp president founder
+    cofounder co-founder freelancer contractor fellow instructor trainer teacher tutor professor lecturer
+    accountant recruiter marketer editor auditor assistant representative agent controller planner producer
+    artist animator statistician economist mathematician physicist chemist biologist nurse doctor physician
+    pharmacist lawyer attorney paralegal clerk cashier salesperson receptionist secretary mechanic electrician
+    banker trader broker journalist photographer translator interpreter modeler modeller maintainer support
+    supervisor superintendent partner principal expert generalist hacker dba pm po ba qa
+""".split())
+
+# Domains and modifiers that go in front of a role ("Data ...", "Full Stack ...")
+FIELD_WORDS = frozenset("""
+    software data web mobile frontend front-end front backend back-end back end fullstack full-stack full stack
+    cloud devops devsecops mlops dataops sysops platform platforms infrastructure infra systems system network
+    networks networking security cyber cybersecurity information it qa quality assurance test testing automation
+    automated embedded firmware hardware game games gameplay ui ux ui/ux product products project projects program
+    programs technical technology solutions solution site reliability database databases db machine learning ml
+    ai artificial intelligence deep nlp computer vision research applied business bi analytics analysis big
+    blockchain ios android application applications app apps release build integration integrations help desk
+    helpdesk service services customer success sales marketing growth digital content graphic visual interaction
+    user experience interface scrum agile delivery development operations ops erp sap salesforce crm etl
+    warehouse warehousing pipeline pipelines signal processing robotics electrical mechanical civil chemical
+    electronics telecom telecommunications financial finance quantitative quant risk compliance legal human
+    resources people talent acquisition office account accounts supply chain logistics procurement health
+    healthcare medical clinical support infosec penetration pentest pentester threat cryptography mainframe
+    integration middleware api apis gis geospatial bioinformatics computational hpc performance tools tooling
+    developer-relations devrel community documentation localization accessibility seo e-commerce ecommerce
+    fintech edtech iot rpa vr ar xr 3d graphics audio video media streaming search ranking recommendation
+    compiler kernel os distributed scalability computing mainframes storage observability monitoring
+    reporting insights decision research-and-development r&d science sciences ethical
+""".split())
+
+SENIORITY_WORDS = frozenset("""
+    senior sr sr. junior jr jr. principal staff chief associate entry entry-level mid mid-level midlevel
+    graduate grad fresher freshers experienced trainee ii iii iv l1 l2 l3 l4 l5 l6 level remote contract
+    part-time full-time freelance permanent temporary hybrid onsite on-site new
+""".split())
+
+# Words with no bearing on the title ("I want to be a ...", "Head of ...")
+FILLER_WORDS = frozenset("""
+    a an the of and or & in for at to as with be i i'm im want wanting looking would like role roles position
+    positions job jobs opening openings title type kind any my am a/an preferably ideally
+""".split())
+
+# Fields that are a position on their own ("Data Science", "DevOps")
+AREA_PHRASES = frozenset([
+    "data science", "data analytics", "data analysis", "data engineering", "machine learning", "deep learning",
+    "artificial intelligence", "ai", "ml", "ai ml", "ai/ml", "nlp", "computer vision", "frontend", "front end",
+    "backend", "back end", "fullstack", "full stack", "devops", "devsecops", "mlops", "cloud", "cloud computing",
+    "web development", "software development", "mobile development", "app development", "ios development",
+    "android development", "game development", "cybersecurity", "cyber security", "information security",
+    "infosec", "network security", "qa", "quality assurance", "testing", "software testing", "test automation",
+    "automation testing", "ui ux", "ui/ux", "ux", "ui", "product management", "project management",
+    "business analysis", "business intelligence", "bi", "it support", "technical support", "it", "sales",
+    "marketing", "digital marketing", "site reliability", "embedded systems", "blockchain", "research",
+    "human resources", "finance", "consulting", "data", "analytics", "networking", "security", "infrastructure",
+])
+
+KEYBOARD_ROWS = ("qwertyuiop", "asdfghjkl", "zxcvbnm", "1234567890")
+# Common non-answers, rejected when nothing else in the input is recognised
+JUNK_WORDS = frozenset("""
+    abc abcd abcde xyz asdf qwerty foo bar baz lorem ipsum blah na n/a none nothing idk dunno whatever something
+    hello hi hey yes no ok okay null nil random dummy sample xxx
+""".split())
+
+WORD_PATTERN = re.compile(r"[^\s\"'`!?:*]+")
+NUMBERED_LEVEL_PATTERN = re.compile(r"^(l|ic|level|grade|e)?[-_]?\d{1,2}$")
+LEVEL_SUFFIX_PATTERN = re.compile(r"^([a-z]+)[-_]?\d{1,2}$")  # "sde2", "engineer-3"
+VOWEL_PATTERN = re.compile(r"[aeiouy]")
+CONSONANT_RUN_PATTERN = re.compile(r"[^aeiouy]{5,}")
+REPEATED_CHAR_PATTERN = re.compile(r"(.)\1\1")
+FUZZY_MIN_WORD_LENGTH = 4
+
+
+def _words(text):
+    return [word.strip(".") for word in WORD_PATTERN.findall(text.casefold()) if word.strip(".")]
+
+
+def _trigrams(word):
+    padded = f"${word}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _edit_distance(a, b, limit):
+    # Optimal string alignment distance (adjacent transpositions count once); limit + 1 once it exceeds limit
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+    return current[-1]
+
+
+def looks_like_gibberish(word):
+    # Keyboard mashes, digit strings and stock non-answers; words in other scripts never count
+    if not word.isascii():
+        return False
+    if word in JUNK_WORDS:
+        return True
+    letters = re.sub(r"[^a-z]", "", word)
+    if not letters or any(c.isdigit() for c in word):
+        return True
+    if not VOWEL_PATTERN.search(letters) or CONSONANT_RUN_PATTERN.search(letters):
+        return True
+    if REPEATED_CHAR_PATTERN.search(letters):
+        return True
+    # A run of keys from one row: four at the start ("asdf...") or five anywhere ("liberty" is fine)
+    return any(letters[:4] in row or any(letters[i:i + 5] in row for i in range(len(letters) - 4))
+               for row in KEYBOARD_ROWS if len(letters) >= 4)
+
+
+class TitleIndex:
+    # Built once per process; classify() and resolve() are read-only, so it is thread-safe
+
+    def __init__(self):
+        self.vocabulary = ROLE_WORDS | FIELD_WORDS | SENIORITY_WORDS
+        self._trigram_index = {}  # trigram -> vocabulary words containing it
+        for word in self.vocabulary:
+            if len(word) >= FUZZY_MIN_WORD_LENGTH:
+                for trigram in _trigrams(word):
+                    self._trigram_index.setdefault(trigram, []).append(word)
+
+    def _closest(self, word):
+        # The vocabulary word within edit distance 1 (2 for longer words), or None
+        limit = 1 if len(word) < 8 else 2
+        trigrams = _trigrams(word)
+        shared = {}
+        for trigram in trigrams:
+            for candidate in self._trigram_index.get(trigram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        # Each edit touches at most 4 trigrams, so candidates sharing fewer can't be within the limit
+        best, best_distance = None, limit + 1
+        for candidate, count in shared.items():
+            if count < len(trigrams) - 4 * limit:
+                continue
+            distance = _edit_distance(word, candidate, limit)
+            if distance < best_distance or (distance == best_distance and best is not None and candidate < best):
+                best, best_distance = candidate, distance
+        return best if best_distance <= limit else None
+
+    def resolve(self, word):
+        # The vocabulary word `word` stands for (typos corrected), "" for filler, or None if unrecognised
+        if word in self.vocabulary:
+            return word
+        if word in FILLER_WORDS:
+            return ""
+        if NUMBERED_LEVEL_PATTERN.match(word):
+            return "level"
+        suffixed = LEVEL_SUFFIX_PATTERN.match(word)
+        if suffixed:
+            base = self.resolve(suffixed.group(1))
+            return None if base is None else f"{base} level".strip()
+        if "-" in word or "/" in word:
+            parts = [self.resolve(part) for part in re.split(r"[-/]", word) if part]
+            if parts and all(part is not None for part in parts):
+                return " ".join(part for part in parts if part)
+            return None
+        if len(word) >= FUZZY_MIN_WORD_LENGTH and word.isalpha():
+            return self._closest(word)
+        return None
+
+    def classify_segment(self, segment):
+        words = _words(segment)
+        if not words:
+            return None
+        if not any(c.isalpha() for c in segment):
+            return TITLE_INVALID
+        techs, leftovers = get_tech_matcher().match(segment)
+        resolved = {word: self.resolve(word) for word in words}
+        # Words neither the title vocabulary nor the technology dictionary accounts for
+        unknown = [word for leftover in leftovers for word in _words(leftover)
+                   if (resolved[word] if word in resolved else self.resolve(word)) is None]
+        title_words = " ".join(resolved[word] for word in words if resolved[word]).split()
+        has_role = any(word in ROLE_WORDS for word in title_words)
+        area = " ".join(word for word in title_words if word not in SENIORITY_WORDS)
+        if not unknown and (has_role or area in AREA_PHRASES):
+            return TITLE_VALID
+        if unknown and not techs and not title_words and all(looks_like_gibberish(word) for word in unknown):
+            return TITLE_INVALID
+        return TITLE_AMBIGUOUS
+
+    def classify(self, text):
+        # Valid when every listed position is a recognisable title, invalid when the input is plainly not one
+        verdicts = {self.classify_segment(segment) for segment in SEPARATOR_PATTERN.split(text or "")} - {None}
+        if not verdicts:
+            return TITLE_INVALID if (text or "").strip() else TITLE_AMBIGUOUS
+        if len(verdicts) == 1:
+            return verdicts.pop()
+        return TITLE_AMBIGUOUS
+
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+
+def get_title_index():
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = TitleIndex()
+        return _default_index
@@ -0,0 +1,375 @@
+"""Load test: N simulated candidates run end to end against a local stand-in for the Gemini model.
+
+    python load_test.py --candidates 50 --concurrency 10 --latency-ms 600 --error-rate 0.02 --json results.json
+    python load_test.py ... --baseline previous_results.json
+
+Each candidate submits the info form, gets technical questions, answers them (elaborating when asked) and
+receives the hiring report, all through InterviewSession and gemini_client, so prompts, caching, parsing
+and thread pools behave as in the app; only the model's generate_content is simulated.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import statistics
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import gemini_client
+from call_metrics import get_call_metrics, print_report
+from interview_session import (AI_DETECTION_LABELS, GeminiBackend, InterviewSession, extract_tech_stack,
+                               validate_desired_position)
+from question_bank import QuestionBank
+from single_flight import get_single_flight
+
+STAND_IN_MODEL_NAME = "load-test-stand-in"
+CHARS_PER_TOKEN = 4  # Rough estimate, close enough for comparing runs
+STREAM_CHUNK_CHARS = 80
+
+SAMPLE_TECH_STACKS = [
+    "Python, Django, PostgreSQL",
+    "JavaScript, React, Node.js",
+    "Java, Spring Boot, Kafka",
+    "Go, Kubernetes, AWS",
+    "Python, Pandas, Spark, Airflow",
+]
+SAMPLE_YEARS_EXPERIENCE = [1, 3, 6, 12]
+# Must not contain any of interview_session.CONVERSATION_ENDING_KEYWORDS, which would end the interview early
+SAMPLE_ANSWERS = [
+    "I would start by profiling the hot path, then cache the results that are expensive to compute.",
+    "In my last role we used it for background jobs; the main trade-off was retries versus idempotency.",
+    "Not sure, I have only used it a little.",
+    "It depends on the data size. For small inputs a simple list is fine, for larger ones I'd use an index.",
+]
+SAMPLE_ELABORATIONS = [
+    "For example, we cut p95 latency in half by moving the report generation to a worker.",
+    "Concretely, I wrote integration tests around the retry logic and added metrics for each queue.",
+]
+
+_meter = threading.local()  # .backend: the MeteredBackend whose LLM call is running on this thread
+
+
+def estimate_tokens(text):
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+class StandInModelError(Exception):
+    pass
+
+
+class StandInModel:
+    # Implements the parts of genai.GenerativeModel that gemini_client uses. Latency to the first byte is
+    # log-normal around latency_ms; the rest of the reply arrives at tokens_per_second.
+
+    def __init__(self, latency_ms=500, latency_sigma=0.5, tokens_per_second=100, error_rate=0.0,
+                 elaboration_rate=0.25, report_tokens=400, seed=None):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.elaboration_rate = elaboration_rate
+        self.report_tokens = report_tokens
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+
+    def _draw(self, sample):
+        with self._random_lock:
+            return sample(self._random)
+
+    def _first_byte_seconds(self):
+        if self.latency_ms <= 0:
+            return 0.0
+        return self._draw(lambda r: r.lognormvariate(math.log(self.latency_ms / 1000), self.latency_sigma))
+
+    def _reply(self, prompt, generation_config):
+        # Keyed on the prompts in interview_session/question_bank; update alongside them
+        schema = (generation_config or {}).get("response_schema") or {}
+        if "depth" in schema.get("properties", {}):  # Answer digest
+            return json.dumps({"depth": self._draw(lambda r: r.choice(("Shallow", "Adequate", "Deep"))),
+                               "engagement": "Medium", "strengths": "Concrete example from a recent project.",
+                               "gaps": "Little detail on trade-offs."})
+        if schema.get("type") == "OBJECT":  # Per-turn answer evaluation
+            needs_elaboration = self._draw(lambda r: r.random()) < self.elaboration_rate
+            return json.dumps({
+                "acknowledgment": "Thanks, that gives me a good picture of your approach.",
+                "needs_elaboration": needs_elaboration,
+                "ai_detection": self._draw(lambda r: r.choice(AI_DETECTION_LABELS)),
+                "next_step_hint": "a concrete example from your experience" if needs_elaboration else "",
+            })
+        if schema.get("type") == "ARRAY":  # Message catalog variants
+            return json.dumps(["Thanks, let's continue."])
+        if '"Desired Position"' in prompt:
+            return "Valid"
+        if "extracting all distinct technologies" in prompt:
+            return prompt.rsplit("Text:", 1)[-1].strip()
+        if "numbered list" in prompt:
+            return "\n".join(f"{i}. Describe a design trade-off you made in a recent project (variant "
+                             f"{self._draw(lambda r: r.randrange(10 ** 6))})." for i in range(1, 4))
+        if "Generate a general question about" in prompt:
+            return "What problem does this technology solve best, and where would you avoid it?"
+        if "Respond only with \"AI-generated\" or \"Human-like\"" in prompt:
+            return self._draw(lambda r: r.choice(AI_DETECTION_LABELS))
+        if "Hiring Recommendation Report" in prompt:
+            filler = "The candidate engaged with every question and gave specific examples. "
+            return "Verdict: Maybe.\n\n" + filler * max(1, self.report_tokens * CHARS_PER_TOKEN // len(filler))
+        return "Thanks for sharing. Let's continue."
+
+    def generate_content(self, contents, generation_config=None, stream=False):
+        backend = getattr(_meter, "backend", None)
+        input_tokens = sum(estimate_tokens(part) for message in contents for part in message["parts"])
+        first_byte = self._first_byte_seconds()
+
+        if self._draw(lambda r: r.random()) < self.error_rate:
+            time.sleep(first_byte)
+            if backend is not None:
+                backend.record(model_calls=1, model_errors=1, input_tokens=input_tokens)
+            raise StandInModelError("429 Resource has been exhausted (simulated)")
+
+        text = self._reply(contents[-1]["parts"][0], generation_config)
+        output_tokens = estimate_tokens(text)
+        if backend is not None:
+            backend.record(model_calls=1, input_tokens=input_tokens, output_tokens=output_tokens)
+        usage = SimpleNamespace(prompt_token_count=input_tokens, candidates_token_count=output_tokens,
+                                total_token_count=input_tokens + output_tokens)
+        if stream:
+            return self._stream(text, first_byte, usage)
+        time.sleep(first_byte + output_tokens / self.tokens_per_second)
+        return SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=[SimpleNamespace(text=text)]))],
+                               usage_metadata=usage)
+
+    def _stream(self, text, first_byte, usage):
+        time.sleep(first_byte)
+        for start in range(0, len(text), STREAM_CHUNK_CHARS):
+            chunk = text[start:start + STREAM_CHUNK_CHARS]
+            time.sleep(estimate_tokens(chunk) / self.tokens_per_second)
+            yield SimpleNamespace(text=chunk, usage_metadata=usage)
+
+
+class MeteredBackend(GeminiBackend):
+    # Per-interview counters. Model calls are attributed through a thread-local set for the duration of each
+    # LLM call, which also covers calls made from the question-generation and answer-evaluation pools.
+
+    def __init__(self):
+        super().__init__()
+        self.stats = {"llm_calls": 0, "model_calls": 0, "model_errors": 0, "input_tokens": 0, "output_tokens": 0}
+        self._lock = threading.Lock()
+
+    def record(self, **counts):
+        with self._lock:
+            for name, count in counts.items():
+                self.stats[name] += count
+
+    def get_response(self, prompt_or_history, **kwargs):
+        self.record(llm_calls=1)
+        previous, _meter.backend = getattr(_meter, "backend", None), self
+        try:
+            return super().get_response(prompt_or_history, **kwargs)
+        finally:
+            _meter.backend = previous
+
+    def stream_response(self, prompt_or_history, **kwargs):
+        self.record(llm_calls=1)
+        previous, _meter.backend = getattr(_meter, "backend", None), self
+        try:
+            yield from super().stream_response(prompt_or_history, **kwargs)
+        finally:
+            _meter.backend = previous
+
+
+def consume_stream(chunks):
+    # Headless stand-in for st.write_stream
+    return "".join(chunks)
+
+
+def run_candidate(candidate_id, seed, think_seconds, shared_bank=None):
+    rng = random.Random(seed)
+    backend = MeteredBackend()
+    session = InterviewSession(llm=backend, question_bank=shared_bank or QuestionBank(path=None))
+    turns = []  # (turn kind, seconds)
+
+    def timed(kind, fn, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            turns.append((kind, time.perf_counter() - started))
+            if think_seconds:
+                time.sleep(rng.uniform(0.5, 1.5) * think_seconds)
+
+    tech_stack_input = rng.choice(SAMPLE_TECH_STACKS)
+    form_results = timed("form_submit", session.run_form_llm_checks, {
+        "desired_positions": (validate_desired_position, "Software Engineer"),
+        "tech_stack_input": (extract_tech_stack, tech_stack_input),
+    })
+    session.submit_candidate_info(
+        full_name=f"Candidate {candidate_id}", email=f"candidate{candidate_id}@example.com",
+        country_code="+1 (USA/Canada)", phone_number="+1 (USA/Canada) 5550100",
+        years_experience=rng.choice(SAMPLE_YEARS_EXPERIENCE), desired_positions="Software Engineer",
+        current_location="Remote", tech_stack=list(form_results.get("tech_stack_input", [])),
+        linkedin_profile=None, current_company="Example Corp")
+    session.start_screening()
+    timed("question_generation", session.ask_first_question)
+
+    while session.stage == "ask_technical_questions":
+        if session.awaiting_elaboration:
+            timed("elaboration", session.step, rng.choice(SAMPLE_ELABORATIONS), render_stream=consume_stream)
+        else:
+            timed("answer", session.step, rng.choice(SAMPLE_ANSWERS), render_stream=consume_stream)
+
+    if session.stage == "conclude_interview":
+        timed("report", session.get_hiring_report, render_stream=consume_stream)
+    return {"candidate": candidate_id, "completed": session.stage == "conclude_interview",
+            "questions": len(session.candidate_info["technical_questions_generated"]),
+            "turns": turns, "stats": dict(backend.stats)}
+
+
+# --- Reporting ---
+
+def summarize(samples):
+    # Nearest-rank percentiles; the same method on every run so results compare across versions
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def percentile(p):
+        return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+    return {"count": len(ordered), "mean": round(statistics.fmean(ordered), 1), "p50": round(percentile(50), 1),
+            "p95": round(percentile(95), 1), "p99": round(percentile(99), 1), "max": round(ordered[-1], 1)}
+
+
+def build_results(config, interviews, wall_seconds):
+    turn_ms = {}
+    for interview in interviews:
+        for kind, seconds in interview["turns"]:
+            turn_ms.setdefault(kind, []).append(seconds * 1000)
+    all_turns = [ms for samples in turn_ms.values() for ms in samples]
+
+    completed = [i for i in interviews if i["completed"]]
+    per_interview = {
+        "llm_calls": summarize([i["stats"]["llm_calls"] for i in interviews]),
+        "model_calls": summarize([i["stats"]["model_calls"] for i in interviews]),
+        "model_errors": summarize([i["stats"]["model_errors"] for i in interviews]),
+        "input_tokens": summarize([i["stats"]["input_tokens"] for i in interviews]),
+        "output_tokens": summarize([i["stats"]["output_tokens"] for i in interviews]),
+        "total_tokens": summarize([i["stats"]["input_tokens"] + i["stats"]["output_tokens"] for i in interviews]),
+        "questions": summarize([i["questions"] for i in interviews]),
+    }
+    return {
+        "version": git_revision(),
+        "config": config,
+        "interviews": len(interviews),
+        "completed_interviews": len(completed),
+        "failed_interviews": sum(1 for i in interviews if "error" in i),
+        "wall_seconds": round(wall_seconds, 2),
+        "interviews_per_minute": round(len(completed) / wall_seconds * 60, 2) if wall_seconds else None,
+        "turn_latency_ms": {"all": summarize(all_turns), **{kind: summarize(ms) for kind, ms in sorted(turn_ms.items())}},
+        "per_interview": per_interview,
+        "single_flight": get_single_flight().stats(),
+        "call_metrics": get_call_metrics().snapshot(),
+    }
+
+
+def git_revision():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def print_results(results, baseline=None):
+    def delta(section, name, stat):
+        if not baseline:
+            return ""
+        previous = baseline.get(section, {}).get(name, {}).get(stat)
+        current = results[section][name].get(stat)
+        if not previous or current is None:
+            return ""
+        return f"  ({(current - previous) / previous * 100:+.1f}% vs {baseline.get('version') or 'baseline'})"
+
+    print(f"{results['completed_interviews']}/{results['interviews']} interviews completed in "
+          f"{results['wall_seconds']} s ({results['interviews_per_minute']} per minute)")
+    coalesced = results["single_flight"]
+    print(f"Single-flight: {coalesced['coalesced']} of {coalesced['calls']} model requests shared an in-flight call")
+    print("Per-turn latency (ms):")
+    for kind, summary in results["turn_latency_ms"].items():
+        if summary["count"]:
+            print(f"  {kind:<20} n={summary['count']:<5} p50={summary['p50']:<9} p95={summary['p95']:<9} "
+                  f"p99={summary['p99']:<9}{delta('turn_latency_ms', kind, 'p95')}")
+    print("Per interview (mean / p95):")
+    for name, summary in results["per_interview"].items():
+        if summary["count"]:
+            print(f"  {name:<20} {summary['mean']:<9} / {summary['p95']:<9}{delta('per_interview', name, 'mean')}")
+    print("By call site:")
+    print_report(results["call_metrics"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate concurrent candidates against a stand-in model.")
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=10, help="Candidates interviewing at the same time.")
+    parser.add_argument("--ramp-seconds", type=float, default=0.0, help="Spread candidate arrivals over this long.")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Mean candidate think time between turns.")
+    parser.add_argument("--latency-ms", type=float, default=500.0, help="Median model time to first byte.")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Log-normal spread of the latency.")
+    parser.add_argument("--tokens-per-second", type=float, default=100.0, help="Model output throughput.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of model calls that fail.")
+    parser.add_argument("--elaboration-rate", type=float, default=0.25,
+                        help="Fraction of answers the model asks the candidate to elaborate on.")
+    parser.add_argument("--report-tokens", type=int, default=400)
+    parser.add_argument("--rpm", type=int, help="Rate-limiter requests/min (default: HIREBOT_GEMINI_RPM).")
+    parser.add_argument("--tpm", type=int, help="Rate-limiter tokens/min (default: HIREBOT_GEMINI_TPM).")
+    parser.add_argument("--warm-bank", action="store_true",
+                        help="Share one question bank across candidates instead of starting each from empty.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Write machine-readable results to this file.")
+    parser.add_argument("--baseline", help="Results file from an earlier run to compare against.")
+    args = parser.parse_args(argv)
+
+    # Memory-only response cache so runs don't read or pollute the app's on-disk cache
+    os.environ["HIREBOT_RESPONSE_CACHE_PATH"] = ""
+    if args.rpm is not None:
+        os.environ["HIREBOT_GEMINI_RPM"] = str(args.rpm)
+    if args.tpm is not None:
+        os.environ["HIREBOT_GEMINI_TPM"] = str(args.tpm)
+    gemini_client.use_model(StandInModel(latency_ms=args.latency_ms, latency_sigma=args.latency_sigma,
+                                         tokens_per_second=args.tokens_per_second, error_rate=args.error_rate,
+                                         elaboration_rate=args.elaboration_rate, report_tokens=args.report_tokens,
+                                         seed=args.seed), STAND_IN_MODEL_NAME)
+    shared_bank = QuestionBank(path=None) if args.warm_bank else None
+    config = {name: value for name, value in vars(args).items() if name not in ("json", "baseline")}
+
+    def run(candidate_id):
+        if args.ramp_seconds:
+            time.sleep(candidate_id * args.ramp_seconds / args.candidates)
+        try:
+            return run_candidate(candidate_id, args.seed * 100003 + candidate_id, args.think_ms / 1000, shared_bank)
+        except Exception as e:
+            print(f"Candidate {candidate_id} failed: {e!r}")
+            return {"candidate": candidate_id, "completed": False, "questions": 0, "turns": [], "error": repr(e),
+                    "stats": {"llm_calls": 0, "model_calls": 0, "model_errors": 0, "input_tokens": 0,
+                              "output_tokens": 0}}
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="candidate") as executor:
+        interviews = list(executor.map(run, range(args.candidates)))
+    results = build_results(config, interviews, time.perf_counter() - started)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Pre-rendered, per-language variants of the bot's fixed transition messages.
+
+Add or refresh languages offline with:
+    python message_catalog.py build --languages Spanish French
+"""
+import argparse
+import json
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from gemini_client import configure_gemini, get_gemini_response
+from rate_limiter import PRIORITY_BACKGROUND
+
+DEFAULT_CATALOG_PATH = os.path.join("data", "message_catalog.json")
+BUILDER_VARIANTS_PER_MESSAGE = 4
+BUILDER_MAX_WORKERS = 8
+
+# message id -> instruction the LLM would otherwise be given on every turn
+MESSAGE_PROMPTS = {
+    "no_technologies": "Inform user that no technologies were found for questions and suggest they go back to the info page to provide a tech stack, then restart the screening.",
+    "questions_unavailable": "Inform user that technical questions could not be generated and to try again later.",
+    "elaboration_next_question": "Acknowledge additional details and present the next question.",
+    "elaboration_all_collected": "Acknowledge additional details and inform user that all technical questions are collected.",
+    "all_questions_answered": "Thank user for answering all technical questions and inform that all necessary information is collected.",
+    "chatbot_lost": "Inform user chatbot is lost and ask to rephrase or tell what they want to do.",
+    "answer_not_processed": "Apologize that the user's answer couldn't be processed right now and ask them to send it again.",
+}
+
+VARIANTS_SCHEMA = {"type": "ARRAY", "items": {"type": "STRING"}}
+
+
+def normalize_language(lang):
+    return " ".join((lang or "English").split()).casefold()
+
+
+class MessageCatalog:
+    # Catalog file layout: {"version": 1, "languages": {language: {message id: [variants]}}}
+
+    def __init__(self, path=DEFAULT_CATALOG_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._messages = {}  # normalized language -> {message id: [variants]}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            for lang, messages in data.get("languages", {}).items():
+                self._messages[normalize_language(lang)] = {
+                    message_id: [v for v in variants if v.strip()] for message_id, variants in messages.items()}
+
+    def get(self, message_id, lang):
+        # Random variant so repeated transitions don't read as robotic; None if the language/message is missing
+        variants = self._messages.get(normalize_language(lang), {}).get(message_id)
+        return random.choice(variants) if variants else None
+
+    def set_variants(self, message_id, lang, variants):
+        with self._lock:
+            self._messages.setdefault(normalize_language(lang), {})[message_id] = variants
+
+    def save(self):
+        with self._lock:
+            data = {"version": 1, "languages": {lang: dict(sorted(messages.items()))
+                                                for lang, messages in sorted(self._messages.items())}}
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+
+
+_default_catalog = None
+_default_catalog_lock = threading.Lock()
+
+
+def get_message_catalog():
+    # Loaded once per process
+    global _default_catalog
+    with _default_catalog_lock:
+        if _default_catalog is None:
+            _default_catalog = MessageCatalog(path=os.getenv("HIREBOT_MESSAGE_CATALOG_PATH", DEFAULT_CATALOG_PATH))
+        return _default_catalog
+
+
+def render_message(message_id, lang, get_response=get_gemini_response):
+    # Zero-latency lookup; the LLM (through the shared response cache) only covers languages missing from the catalog
+    message = get_message_catalog().get(message_id, lang)
+    if message is not None:
+        return message
+    return get_response(MESSAGE_PROMPTS[message_id], is_history=False, preferred_language=lang, cache=True,
+                        call_site=f"message.{message_id}")
+
+
+# --- Offline Builder ---
+
+def build_variants_prompt(message_id, lang, count):
+    return f"""
+    You are writing fixed messages for TalentBot, a friendly and professional technical-screening chatbot.
+    Write {count} distinct variants of a short chat message (1-2 sentences each) that follows this instruction:
+    "{MESSAGE_PROMPTS[message_id]}"
+    The variants must all carry the same meaning but differ in wording. Do not include placeholders or names.
+    Write every variant in {lang}. Return a JSON array of strings.
+    """
+
+
+def generate_variants(message_id, lang, count):
+    variants = get_gemini_response(build_variants_prompt(message_id, lang, count), is_history=False,
+                                   response_schema=VARIANTS_SCHEMA, preferred_language=lang, raise_errors=True,
+                                   priority=PRIORITY_BACKGROUND, call_site="message_catalog_build")
+    if not isinstance(variants, list):
+        raise ValueError(f"Expected a JSON array of variants, got: {variants!r}")
+    return message_id, lang, [v.strip() for v in variants if isinstance(v, str) and v.strip()]
+
+
+def build_catalog(catalog, languages, count=BUILDER_VARIANTS_PER_MESSAGE, max_workers=BUILDER_MAX_WORKERS,
+                  force=False):
+    jobs = [(message_id, lang) for lang in languages for message_id in MESSAGE_PROMPTS
+            if force or catalog.get(message_id, lang) is None]
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="catalog-build") as executor:
+        futures = [executor.submit(generate_variants, message_id, lang, count) for message_id, lang in jobs]
+        for (message_id, lang), future in zip(jobs, futures):
+            try:
+                _, _, variants = future.result()
+            except Exception as e:
+                print(f"Error generating '{message_id}' in {lang}: {e}")
+                continue
+            if variants:
+                catalog.set_variants(message_id, lang, variants)
+                print(f"{message_id} [{lang}]: {len(variants)} variants")
+    catalog.save()
+    return len(jobs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-render localized bot transition messages.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="Generate message variants for the given languages.")
+    build_parser.add_argument("--languages", nargs="+", required=True)
+    build_parser.add_argument("--variants", type=int, default=BUILDER_VARIANTS_PER_MESSAGE)
+    build_parser.add_argument("--workers", type=int, default=BUILDER_MAX_WORKERS)
+    build_parser.add_argument("--force", action="store_true", help="Regenerate messages that already exist.")
+    build_parser.add_argument("--path", default=DEFAULT_CATALOG_PATH)
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        parser.error("GOOGLE_API_KEY is not set.")
+    configure_gemini(api_key)
+
+    catalog = MessageCatalog(path=args.path)
+    built = build_catalog(catalog, args.languages, count=args.variants, max_workers=args.workers, force=args.force)
+    print(f"Built {built} messages into {args.path}.")
+
+
+if __name__ == "__main__":
+    main()
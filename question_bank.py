@@ -0,0 +1,222 @@
+"""Pre-built technical question bank indexed by technology, experience band and language.
+
+Build or top up the bank offline with:
+    python question_bank.py build --techs Python React AWS --languages English
+"""
+import argparse
+import json
+import os
+import random
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_BANK_PATH = os.path.join(".cache", "question_bank.json")  # Written at runtime, so kept out of the source tree
+
+# (band name, minimum years of experience, representative years used when pre-filling the bank)
+EXPERIENCE_BANDS = (
+    ("entry", 0, 1),
+    ("mid", 2, 3),
+    ("senior", 5, 7),
+    ("lead", 10, 12),
+)
+
+# Technologies most of our candidates list; the default set for the offline builder
+COMMON_TECHS = [
+    "Python", "Java", "JavaScript", "TypeScript", "C++", "C#", "Go", "Rust", "Kotlin", "Swift", "PHP", "Ruby",
+    "SQL", "React", "Angular", "Vue.js", "Node.js", "Django", "Flask", "FastAPI", "Spring Boot", ".NET",
+    "HTML", "CSS", "AWS", "Azure", "Google Cloud", "Docker", "Kubernetes", "Terraform", "Git", "Linux",
+    "PostgreSQL", "MySQL", "MongoDB", "Redis", "Kafka", "Spark", "Pandas", "TensorFlow", "PyTorch",
+    "Machine Learning", "Data Structures", "System Design",
+]
+
+BUILDER_QUESTIONS_PER_KEY = 9  # The pool interview_session tops a bank entry up to
+BUILDER_MAX_ROUNDS = 4
+BUILDER_MAX_WORKERS = 8
+
+
+def normalize_tech(tech):
+    return " ".join(tech.split()).casefold()
+
+
+def normalize_language(lang):
+    return " ".join((lang or "English").split()).casefold()
+
+
+def experience_band(years_exp):
+    band = EXPERIENCE_BANDS[0][0]
+    for name, min_years, _ in EXPERIENCE_BANDS:
+        if (years_exp or 0) >= min_years:
+            band = name
+    return band
+
+
+def build_question_gen_prompt(tech, years_exp, lang):
+    return f"""
+    You are an AI Hiring Assistant for a tech recruitment agency.
+    The candidate has {years_exp} years of experience.
+    Based on the technology or concept "{tech}", generate 2-3 distinct, varied, and concise technical interview questions suitable for a candidate with {years_exp} years of experience.
+    Ensure a good mix of conceptual, practical/scenario-based, and best-practice questions.
+    Present them as a numbered list, one question per line. Do NOT include any introductory or concluding sentences or conversational filler.
+    Respond in {lang}.
+
+    Example for Python and 3 years experience:
+    1. Explain decorator patterns in Python and provide a use case.
+    2. How would you optimize a Python application for memory efficiency?
+    """
+
+
+def parse_numbered_questions(raw_text):
+    cleaned_questions = []
+    for q in raw_text.split('\n'):
+        cleaned_q = re.sub(r"^\d+\.\s*", "", q).strip()
+        if cleaned_q:
+            cleaned_questions.append(cleaned_q)
+    return cleaned_questions
+
+
+class QuestionBank:
+    # JSON-backed so the vetted questions stay reviewable in a diff; the in-memory index is
+    # {(normalized tech, experience band, normalized language): [questions]}.
+
+    def __init__(self, path=DEFAULT_BANK_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        self._index = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        for entry in data.get("entries", []):
+            key = (normalize_tech(entry["tech"]), entry["band"], normalize_language(entry["language"]))
+            self._index.setdefault(key, [])
+            self._extend_locked(key, entry["questions"])
+
+    def count(self, tech, years_exp, lang):
+        key = (normalize_tech(tech), experience_band(years_exp), normalize_language(lang))
+        with self._lock:
+            return len(self._index.get(key, []))
+
+    def sample(self, tech, years_exp, lang, k, exclude=()):
+        # Random selection without repeats; questions in `exclude` (e.g. already asked) are skipped
+        key = (normalize_tech(tech), experience_band(years_exp), normalize_language(lang))
+        with self._lock:
+            candidates = [q for q in self._index.get(key, []) if q not in exclude]
+        return random.sample(candidates, min(k, len(candidates)))
+
+    def add(self, tech, years_exp, lang, questions):
+        key = (normalize_tech(tech), experience_band(years_exp), normalize_language(lang))
+        with self._lock:
+            added = self._extend_locked(key, questions)
+            self._dirty = self._dirty or added > 0
+        return added
+
+    def save(self):
+        # Atomic replace so a concurrent reader never sees a half-written file
+        with self._lock:
+            if not self._dirty or not self.path:
+                return
+            entries = [{"tech": tech, "band": band, "language": lang, "questions": questions}
+                       for (tech, band, lang), questions in sorted(self._index.items())]
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": 1, "entries": entries}, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+    def _extend_locked(self, key, questions):
+        existing = self._index.setdefault(key, [])
+        seen = {q.casefold() for q in existing}
+        added = 0
+        for question in questions:
+            question = question.strip()
+            if question and question.casefold() not in seen:
+                existing.append(question)
+                seen.add(question.casefold())
+                added += 1
+        return added
+
+
+_default_bank = None
+_default_bank_lock = threading.Lock()
+
+
+def get_question_bank():
+    global _default_bank
+    with _default_bank_lock:
+        if _default_bank is None:
+            _default_bank = QuestionBank(path=os.getenv("HIREBOT_QUESTION_BANK_PATH", DEFAULT_BANK_PATH))
+        return _default_bank
+
+
+# --- Offline Builder ---
+
+def fill_bank_entry(bank, tech, band, representative_years, lang, target_count):
+    from gemini_client import get_gemini_response
+    from rate_limiter import PRIORITY_BACKGROUND
+
+    rounds = 0
+    while bank.count(tech, representative_years, lang) < target_count and rounds < BUILDER_MAX_ROUNDS:
+        try:
+            raw_questions = get_gemini_response(build_question_gen_prompt(tech, representative_years, lang),
+                                                is_history=False, preferred_language=lang, raise_errors=True,
+                                                priority=PRIORITY_BACKGROUND, call_site="question_bank_fill")
+        except Exception as e:
+            print(f"Error generating questions for {tech} [{band}, {lang}]: {e}")
+            break
+        bank.add(tech, representative_years, lang, parse_numbered_questions(raw_questions))
+        rounds += 1
+    return tech, band, lang, bank.count(tech, representative_years, lang)
+
+
+def build_bank(bank, techs, languages, target_count=BUILDER_QUESTIONS_PER_KEY, max_workers=BUILDER_MAX_WORKERS):
+    jobs = [(tech, band, representative_years, lang)
+            for tech in techs
+            for band, _, representative_years in EXPERIENCE_BANDS
+            for lang in languages
+            if bank.count(tech, representative_years, lang) < target_count]
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bank-build") as executor:
+        futures = [executor.submit(fill_bank_entry, bank, tech, band, years, lang, target_count)
+                   for tech, band, years, lang in jobs]
+        for future in futures:
+            tech, band, lang, count = future.result()
+            print(f"{tech} [{band}, {lang}]: {count} questions")
+    bank.save()
+    return len(jobs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-fill the technical question bank.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="Generate questions for every tech/band/language combination.")
+    build_parser.add_argument("--techs", nargs="+", default=COMMON_TECHS)
+    build_parser.add_argument("--languages", nargs="+", default=["English"])
+    build_parser.add_argument("--per-key", type=int, default=BUILDER_QUESTIONS_PER_KEY,
+                              help="Target number of questions per tech/band/language.")
+    build_parser.add_argument("--workers", type=int, default=BUILDER_MAX_WORKERS)
+    build_parser.add_argument("--path", default=os.getenv("HIREBOT_QUESTION_BANK_PATH") or DEFAULT_BANK_PATH)
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    from gemini_client import configure_gemini
+
+    load_dotenv()
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        parser.error("GOOGLE_API_KEY is not set.")
+    configure_gemini(api_key)
+
+    bank = QuestionBank(path=args.path)
+    filled = build_bank(bank, args.techs, args.languages, target_count=args.per_key, max_workers=args.workers)
+    print(f"Filled {filled} bank entries into {args.path}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Process-wide token-bucket limiter in front of the Gemini model (requests/min and tokens/min).
+
+Waiting callers are served in priority order, so candidate-facing calls overtake background scoring and
+offline builders when the app runs at its quota ceiling. Limits come from HIREBOT_GEMINI_RPM and
+HIREBOT_GEMINI_TPM; 0 disables a bucket.
+"""
+import heapq
+import itertools
+import os
+import threading
+import time
+
+PRIORITY_CANDIDATE = 0  # A candidate is waiting on the reply
+PRIORITY_BACKGROUND = 1  # Answer scoring, offline builders
+
+DEFAULT_REQUESTS_PER_MINUTE = 2000
+DEFAULT_TOKENS_PER_MINUTE = 4_000_000
+
+
+class TokenBucketLimiter:
+    # Each bucket holds up to one minute's allowance and refills continuously
+
+    def __init__(self, requests_per_minute, tokens_per_minute, clock=time.monotonic):
+        self._clock = clock
+        self._capacity = {"requests": requests_per_minute, "tokens": tokens_per_minute}
+        self._available = dict(self._capacity)
+        self._updated = clock()
+        self._condition = threading.Condition()
+        self._waiters = []  # heap of (priority, arrival) for callers blocked in acquire
+        self._arrivals = itertools.count()
+
+    def _refill_locked(self):
+        now = self._clock()
+        elapsed = now - self._updated
+        self._updated = now
+        for bucket, capacity in self._capacity.items():
+            if capacity:
+                self._available[bucket] = min(capacity, self._available[bucket] + capacity * elapsed / 60)
+
+    def _wait_seconds_locked(self, needed):
+        wait_seconds = 0.0
+        for bucket, amount in needed.items():
+            capacity = self._capacity[bucket]
+            if capacity and self._available[bucket] < amount:
+                wait_seconds = max(wait_seconds, (amount - self._available[bucket]) / (capacity / 60))
+        return wait_seconds
+
+    def acquire(self, tokens=0, priority=PRIORITY_CANDIDATE):
+        # Blocks until the call fits both buckets and no higher-priority (or earlier equal-priority) caller
+        # is waiting. Returns the seconds spent waiting.
+        started = self._clock()
+        needed = {"requests": 1, "tokens": tokens}
+        for bucket, capacity in self._capacity.items():
+            if capacity:
+                needed[bucket] = min(needed[bucket], capacity)  # An oversized call must still get through
+        entry = (priority, next(self._arrivals))
+        with self._condition:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    self._refill_locked()
+                    timeout = None
+                    if self._waiters[0] == entry:
+                        timeout = self._wait_seconds_locked(needed)
+                        if timeout <= 0:
+                            for bucket, amount in needed.items():
+                                if self._capacity[bucket]:
+                                    self._available[bucket] -= amount
+                            return self._clock() - started
+                    self._condition.wait(timeout=timeout)
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+
+    def adjust_tokens(self, delta):
+        # Settle the difference between the estimate passed to acquire() and the tokens actually used; a
+        # negative delta refunds tokens (never beyond the bucket's capacity)
+        if not self._capacity["tokens"] or not delta:
+            return
+        with self._condition:
+            self._refill_locked()
+            self._available["tokens"] = min(self._capacity["tokens"], self._available["tokens"] - delta)
+            self._condition.notify_all()
+
+
+_default_limiter = None
+_default_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    global _default_limiter
+    with _default_limiter_lock:
+        if _default_limiter is None:
+            _default_limiter = TokenBucketLimiter(
+                requests_per_minute=int(os.getenv("HIREBOT_GEMINI_RPM", DEFAULT_REQUESTS_PER_MINUTE)),
+                tokens_per_minute=int(os.getenv("HIREBOT_GEMINI_TPM", DEFAULT_TOKENS_PER_MINUTE)))
+        return _default_limiter
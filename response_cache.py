@@ -0,0 +1,196 @@
+"""Process-wide response cache for Gemini calls: an in-memory LRU tier backed by SQLite."""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_CACHE_PATH = os.path.join(".cache", "gemini_responses.sqlite3")
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60  # One week
+DEFAULT_MAX_MEMORY_ENTRIES = 512
+DEFAULT_MAX_MEMORY_BYTES = 32 * 1024 * 1024  # Serialized size of the values held in memory
+DEFAULT_MAX_DISK_ENTRIES = 20000
+EVICTION_CHECK_INTERVAL = 100  # Run disk eviction once every N writes
+DISK_TIMEOUT_SECONDS = 1  # How long a call waits on a locked database before treating it as a miss or skip
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(model_name, contents, preferred_language, generation_config=None, response_schema=None):
+    key_material = json.dumps({
+        "model": model_name,
+        "contents": contents,
+        "language": preferred_language,
+        "generation_config": generation_config,
+        "response_schema": response_schema,
+    }, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(key_material.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    # Values must be JSON-serializable (plain text or a parsed JSON-mode response).
+    # Safe to share between every session and thread: the memory tier has its own lock, held only for dict
+    # operations, and each thread talks to SQLite over its own connection, so disk I/O never blocks memory hits.
+    # Disk errors (a locked or unreadable database) are logged and never raised: a failed read is a miss and a
+    # failed write is skipped, while the memory tier keeps working.
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl_seconds=DEFAULT_TTL_SECONDS,
+                 max_memory_entries=DEFAULT_MAX_MEMORY_ENTRIES, max_disk_entries=DEFAULT_MAX_DISK_ENTRIES,
+                 max_memory_bytes=DEFAULT_MAX_MEMORY_BYTES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_entries = max_disk_entries
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> (expires_at, value, size in bytes), least recently used first
+        self._memory_bytes = 0
+        self._writes_since_eviction = 0
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0, "disk_errors": 0}
+        self._local = threading.local()
+
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            try:
+                conn = self._connect()
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+            except sqlite3.Error as e:
+                logger.warning("Response cache database %s unavailable, serving from memory for now: %s", path, e)
+
+    def _connect(self):
+        # One connection per thread; None when the cache is memory-only
+        if not self.path:
+            return None
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=DISK_TIMEOUT_SECONDS, isolation_level=None)
+        return conn
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value, _ = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return value
+                self._forget_locked(key)
+
+        row = None
+        try:
+            conn = self._connect()
+            if conn is not None:
+                row = conn.execute("SELECT value, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None and row[1] > now:
+                    conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as e:
+            logger.warning("Response cache read failed, treating it as a miss: %s", e)
+            self._count_disk_error()
+        if row is not None and row[1] > now:
+            value = json.loads(row[0])
+            with self._lock:
+                self._remember_locked(key, row[1], value, len(row[0].encode("utf-8")))
+                self._stats["disk_hits"] += 1
+            return value
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def set(self, key, value):
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._remember_locked(key, expires_at, value, len(payload.encode("utf-8")))
+            self._stats["writes"] += 1
+            self._writes_since_eviction += 1
+            evict = self._writes_since_eviction >= EVICTION_CHECK_INTERVAL
+            if evict:
+                self._writes_since_eviction = 0
+
+        try:
+            conn = self._connect()
+            if conn is None:
+                return
+            conn.execute("INSERT OR REPLACE INTO responses (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                         (key, payload, expires_at, now))
+            if evict:
+                self._evict_disk(conn, now)
+        except sqlite3.Error as e:
+            logger.warning("Response cache write failed, keeping the entry in memory only: %s", e)
+            self._count_disk_error()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        try:
+            conn = self._connect()
+            if conn is not None:
+                conn.execute("DELETE FROM responses")
+        except sqlite3.Error as e:
+            logger.warning("Response cache clear failed on disk: %s", e)
+            self._count_disk_error()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats, memory_entries=len(self._memory), memory_bytes=self._memory_bytes)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def _count_disk_error(self):
+        with self._lock:
+            self._stats["disk_errors"] += 1
+
+    def _forget_locked(self, key):
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= entry[2]
+
+    def _remember_locked(self, key, expires_at, value, size):
+        self._forget_locked(key)
+        if size > self.max_memory_bytes:
+            return  # Larger than the whole memory tier; served from disk only (if there is one)
+        self._memory[key] = (expires_at, value, size)
+        self._memory_bytes += size
+        while len(self._memory) > self.max_memory_entries or self._memory_bytes > self.max_memory_bytes:
+            _, (_, _, evicted_size) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_size
+
+    def _evict_disk(self, conn, now):
+        # Drop expired rows first, then the least recently used rows beyond max_disk_entries
+        evicted = conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,)).rowcount
+        overflow = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_disk_entries
+        if overflow > 0:
+            evicted += conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_access LIMIT ?)",
+                (overflow,)).rowcount
+        with self._lock:
+            self._stats["evictions"] += evicted
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    # One cache per process; HIREBOT_RESPONSE_CACHE_PATH="" keeps it memory-only
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache(path=os.getenv("HIREBOT_RESPONSE_CACHE_PATH", DEFAULT_CACHE_PATH))
+        return _default_cache
@@ -0,0 +1,197 @@
+"""Resume ingestion: text extraction in worker processes, cached by file content hash.
+
+PDF and DOCX parsing runs in a process pool, so a large or slow file never blocks the Streamlit script thread
+(or holds the GIL while it parses). Each distinct file is parsed and scanned for technologies once: results are
+cached by the SHA-256 of its bytes, so re-uploads and reruns are free. Parsing needs the optional pypdf (PDF) and
+python-docx (DOCX) packages; without one, uploads of that type get a message instead of being read.
+"""
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from response_cache import ResponseCache
+
+RESUME_MAX_BYTES = 5 * 1024 * 1024
+RESUME_MAX_PAGES = 15
+RESUME_MAX_TEXT_CHARS = 30000  # Extracted text beyond this is dropped (also bounds DOCX, which has no pages)
+RESUME_TECH_EXCERPT_CHARS = 8000  # Sent to tech-stack extraction
+RESUME_PARSE_TIMEOUT_SECONDS = 20
+RESUME_PARSE_MAX_WORKERS = 2
+RESUME_INGEST_MAX_WORKERS = 4
+RESUME_CACHE_TTL_SECONDS = 24 * 60 * 60
+RESUME_CACHE_MAX_ENTRIES = 256
+
+FILE_TYPES = {".pdf": "pdf", ".docx": "docx"}
+
+
+class ResumeError(Exception):
+    # The message is shown to the candidate
+    pass
+
+
+def resume_content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def resume_file_type(file_name):
+    file_type = FILE_TYPES.get(os.path.splitext(file_name or "")[1].lower())
+    if file_type is None:
+        raise ResumeError("Please upload your resume as a PDF or DOCX file.")
+    return file_type
+
+
+# --- Text Extraction (runs in worker processes) ---
+
+def _extract_pdf_text(data):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise ResumeError("PDF resumes can't be read on this server (pypdf is not installed).")
+    try:
+        reader = PdfReader(io.BytesIO(data))
+        if len(reader.pages) > RESUME_MAX_PAGES:
+            raise ResumeError(f"Your resume has {len(reader.pages)} pages; please upload at most {RESUME_MAX_PAGES}.")
+        parts = []
+        length = 0
+        for page in reader.pages:
+            page_text = page.extract_text() or ""
+            parts.append(page_text)
+            length += len(page_text)
+            if length >= RESUME_MAX_TEXT_CHARS:
+                break
+    except ResumeError:
+        raise
+    except Exception as e:  # pypdf raises a variety of errors for damaged or encrypted files
+        raise ResumeError(f"We couldn't read this PDF ({type(e).__name__}).")
+    return "\n".join(parts), len(reader.pages)
+
+
+def _extract_docx_text(data):
+    try:
+        import docx
+    except ImportError:
+        raise ResumeError("DOCX resumes can't be read on this server (python-docx is not installed).")
+    try:
+        document = docx.Document(io.BytesIO(data))
+        parts = [paragraph.text for paragraph in document.paragraphs]
+        for table in document.tables:
+            for row in table.rows:
+                parts.extend(cell.text for cell in row.cells)
+    except Exception as e:
+        raise ResumeError(f"We couldn't read this DOCX file ({type(e).__name__}).")
+    return "\n".join(parts), None
+
+
+def extract_resume_text(data, file_type):
+    # Returns (text, page count or None); module-level so the process pool can pickle it
+    extract = _extract_pdf_text if file_type == "pdf" else _extract_docx_text
+    text, pages = extract(data)
+    text = "\n".join(line.strip() for line in text.splitlines() if line.strip())
+    return text[:RESUME_MAX_TEXT_CHARS], pages
+
+
+_default_parse_executor = None
+_default_ingest_executor = None
+_default_executor_lock = threading.Lock()
+
+
+def get_resume_parse_executor():
+    # Spawned rather than forked: the app process runs many threads, and forking those isn't safe
+    global _default_parse_executor
+    with _default_executor_lock:
+        if _default_parse_executor is None:
+            _default_parse_executor = ProcessPoolExecutor(max_workers=RESUME_PARSE_MAX_WORKERS,
+                                                          mp_context=multiprocessing.get_context("spawn"))
+        return _default_parse_executor
+
+
+def _discard_parse_executor(executor):
+    # For a worker that crashed (e.g. out of memory on a hostile file), which breaks the whole pool, or one stuck
+    # on a parse that timed out. Its workers are killed, so they can't keep parsing; the next call gets a new pool.
+    global _default_parse_executor
+    with _default_executor_lock:
+        if _default_parse_executor is executor:
+            _default_parse_executor = None
+    processes = list((getattr(executor, "_processes", None) or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.kill()
+
+
+def get_resume_ingest_executor():
+    # Threads that wait on the parse pool and run tech detection, so callers get a Future right away
+    global _default_ingest_executor
+    with _default_executor_lock:
+        if _default_ingest_executor is None:
+            _default_ingest_executor = ThreadPoolExecutor(max_workers=RESUME_INGEST_MAX_WORKERS,
+                                                          thread_name_prefix="resume-ingest")
+        return _default_ingest_executor
+
+
+_default_resume_cache = None
+_default_resume_cache_lock = threading.Lock()
+
+
+def get_resume_cache():
+    # Memory-only by default, since resumes are personal data; HIREBOT_RESUME_CACHE_PATH puts it on disk
+    global _default_resume_cache
+    with _default_resume_cache_lock:
+        if _default_resume_cache is None:
+            _default_resume_cache = ResponseCache(path=os.getenv("HIREBOT_RESUME_CACHE_PATH", ""),
+                                                  ttl_seconds=RESUME_CACHE_TTL_SECONDS,
+                                                  max_memory_entries=RESUME_CACHE_MAX_ENTRIES)
+        return _default_resume_cache
+
+
+# --- Ingestion ---
+
+def ingest_resume(data, file_name, lang, detect_techs):
+    # Validates, parses (in the process pool) and scans a resume for technologies; raises ResumeError.
+    # detect_techs(text, lang) -> [technology]. Returns {"content_hash", "file_name", "pages", "chars", "techs"}.
+    if len(data) > RESUME_MAX_BYTES:
+        raise ResumeError(f"Your resume is larger than {RESUME_MAX_BYTES // (1024 * 1024)} MB.")
+    file_type = resume_file_type(file_name)
+    content_hash = resume_content_hash(data)
+    cache = get_resume_cache()
+
+    parsed = cache.get(f"text:{content_hash}")
+    if parsed is None:
+        executor = get_resume_parse_executor()
+        try:
+            text, pages = executor.submit(extract_resume_text, data, file_type).result(
+                timeout=RESUME_PARSE_TIMEOUT_SECONDS)
+        except TimeoutError:
+            # A parse that ran this long may never finish; a cancelled future doesn't stop a running worker
+            _discard_parse_executor(executor)
+            raise ResumeError("Reading your resume took too long; please upload a smaller file.")
+        except BrokenProcessPool:
+            _discard_parse_executor(executor)
+            raise ResumeError("We couldn't read your resume. Please try uploading it again.")
+        parsed = {"text": text, "pages": pages}
+        cache.set(f"text:{content_hash}", parsed)
+    if not parsed["text"]:
+        raise ResumeError("We couldn't find any text in your resume (is it a scanned image?).")
+
+    techs = cache.get(f"techs:{content_hash}:{lang}")
+    if techs is None:
+        techs = detect_techs(parsed["text"][:RESUME_TECH_EXCERPT_CHARS], lang)
+        cache.set(f"techs:{content_hash}:{lang}", techs)
+    return {"content_hash": content_hash, "file_name": file_name, "pages": parsed["pages"],
+            "chars": len(parsed["text"]), "techs": techs}
+
+
+def submit_resume_ingestion(data, file_name, lang, detect_techs):
+    return get_resume_ingest_executor().submit(ingest_resume, data, file_name, lang, detect_techs)
+
+
+def merge_tech_stacks(primary, extra):
+    # The candidate's own list first, then technologies found only on the resume; case-insensitive de-duplication
+    merged = {}
+    for tech in list(primary) + list(extra):
+        merged.setdefault(" ".join(tech.split()).casefold(), tech)
+    return list(merged.values())
@@ -0,0 +1,157 @@
+"""VADER sentiment scoring with a lazily loaded, process-wide analyzer.
+
+The lexicon is fetched at build time, never on the request path:
+    python sentiment.py download
+
+Archived answers can be re-scored in bulk (e.g. after changing the thresholds) with:
+    python sentiment.py rescore answers.json
+"""
+import argparse
+import json
+import os
+import string
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+LOCAL_NLTK_DATA = os.getenv("HIREBOT_NLTK_DATA", "nltk_data")
+VADER_LEXICON_RESOURCE = "sentiment/vader_lexicon"
+
+# Compound-score cut-offs for the labels shown to recruiters
+POSITIVE_THRESHOLD = 0.05
+NEGATIVE_THRESHOLD = -0.05
+
+# Below this many distinct texts, worker start-up costs more than it saves
+BATCH_PROCESS_POOL_MIN_TEXTS = 2000
+BATCH_CHUNK_SIZE = 500
+
+_analyzer = None
+_analyzer_loaded = False
+_analyzer_lock = threading.Lock()
+
+
+def _register_local_nltk_data(nltk):
+    if LOCAL_NLTK_DATA not in nltk.data.path:
+        nltk.data.path.insert(0, LOCAL_NLTK_DATA)
+
+
+def get_sentiment_analyzer():
+    # Returns None (after a single warning) when nltk or the lexicon hasn't been installed
+    global _analyzer, _analyzer_loaded
+    if _analyzer_loaded:
+        return _analyzer
+    with _analyzer_lock:
+        if not _analyzer_loaded:
+            try:
+                import nltk
+                from nltk.sentiment.vader import SentimentIntensityAnalyzer
+            except ImportError as e:
+                print(f"Warning: nltk is not available ({e}). Sentiment is disabled.")
+                _analyzer_loaded = True
+                return None
+
+            _register_local_nltk_data(nltk)
+            try:
+                nltk.data.find(VADER_LEXICON_RESOURCE)
+                _analyzer = SentimentIntensityAnalyzer()
+            except LookupError:
+                print("Warning: VADER lexicon not found; run 'python sentiment.py download'. Sentiment is disabled.")
+            _analyzer_loaded = True
+    return _analyzer
+
+
+def sentiment_label(compound):
+    if compound >= POSITIVE_THRESHOLD:
+        return "Positive 😊"
+    elif compound <= NEGATIVE_THRESHOLD:
+        return "Negative 😞"
+    else:
+        return "Neutral 😐"
+
+
+def analyze_sentiment(text):
+    analyzer = get_sentiment_analyzer()
+    if analyzer is None:
+        return "N/A"
+    return sentiment_label(analyzer.polarity_scores(text)['compound'])
+
+
+# --- Batch Scoring ---
+
+def _candidate_tokens(text):
+    # Superset of the lexicon lookups VADER makes: it keys on each whitespace token, lowercased, either
+    # as-is or with its leading/trailing punctuation removed
+    for token in text.split():
+        token = token.lower()
+        yield token
+        stripped = token.strip(string.punctuation)
+        if stripped != token:
+            yield stripped
+
+
+def _compound_scores(texts):
+    # Runs in worker processes too; each builds its own analyzer once
+    analyzer = get_sentiment_analyzer()
+    return [analyzer.polarity_scores(text)['compound'] for text in texts]
+
+
+def score_sentiments(texts, max_workers=None):
+    # Compound score per text, identical to analyze_sentiment's; None for every text if the lexicon is missing.
+    # Duplicates are scored once, and texts sharing no token with the lexicon are exactly 0.0 (every VADER
+    # rule only modifies the valence of lexicon words), so only the rest pay for the full rule pipeline.
+    texts = list(texts)
+    analyzer = get_sentiment_analyzer()
+    if analyzer is None:
+        return [None] * len(texts)
+
+    unique_texts = list(dict.fromkeys(texts))
+    tokens_by_text = [set(_candidate_tokens(text)) for text in unique_texts]
+    lexicon_hits = set().union(*tokens_by_text) & analyzer.lexicon.keys()
+    compounds = {text: 0.0 for text, tokens in zip(unique_texts, tokens_by_text) if tokens.isdisjoint(lexicon_hits)}
+
+    to_score = [text for text in unique_texts if text not in compounds]
+    if len(to_score) >= BATCH_PROCESS_POOL_MIN_TEXTS and max_workers != 1:
+        chunks = [to_score[i:i + BATCH_CHUNK_SIZE] for i in range(0, len(to_score), BATCH_CHUNK_SIZE)]
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            scores = [score for chunk_scores in executor.map(_compound_scores, chunks) for score in chunk_scores]
+    else:
+        scores = _compound_scores(to_score)
+    compounds.update(zip(to_score, scores))
+    return [compounds[text] for text in texts]
+
+
+def analyze_sentiments(texts, max_workers=None):
+    # Batch counterpart of analyze_sentiment: same labels, same "N/A" when the lexicon is missing
+    return [sentiment_label(compound) if compound is not None else "N/A"
+            for compound in score_sentiments(texts, max_workers=max_workers)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Install or verify the VADER lexicon, or re-score archived answers.")
+    parser.add_argument("command", choices=["download", "verify", "rescore"])
+    parser.add_argument("path", nargs="?", help="rescore: JSON file holding a list of answer strings.")
+    parser.add_argument("--workers", type=int, help="rescore: worker processes for large files.")
+    args = parser.parse_args(argv)
+
+    if args.command == "rescore":
+        if not args.path:
+            parser.error("rescore needs a JSON file of answers.")
+        with open(args.path, encoding="utf-8") as f:
+            answers = json.load(f)
+        for label, count in Counter(analyze_sentiments(answers, max_workers=args.workers)).most_common():
+            print(f"{label}: {count}")
+        return
+
+    import nltk
+
+    _register_local_nltk_data(nltk)
+    if args.command == "download":
+        nltk.download("vader_lexicon", download_dir=LOCAL_NLTK_DATA, quiet=True)
+    try:
+        print(f"VADER lexicon found at {nltk.data.find(VADER_LEXICON_RESOURCE)}")
+    except LookupError:
+        parser.exit(1, "VADER lexicon is missing; run 'python sentiment.py download'.\n")
+
+
+if __name__ == "__main__":
+    main()
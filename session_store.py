@@ -0,0 +1,293 @@
+"""Durable, append-only store for interview sessions (SQLite in WAL mode).
+
+Each session is an ordered log of events: chat messages, state changes (only the fields and answer entries that
+changed) and hiring reports. Appends are queued and committed in batches by a single writer thread, so callers
+never wait on disk. A session is resumed by replaying its log, keyed by the resume token.
+
+The log holds candidates' personal data (name, email, phone, answers), so persistence is opt-in: set
+HIREBOT_SESSION_STORE_PATH (e.g. .cache/sessions.sqlite3) to turn it on. Sessions not updated for
+HIREBOT_SESSION_RETENTION_DAYS (default 30; 0 keeps them forever) are deleted. Batches that still fail after
+retries are written to PATH.failed.jsonl rather than dropped. Inspect or maintain stored interviews with:
+    python session_store.py list
+    python session_store.py show TOKEN
+    python session_store.py purge --days 30
+    python session_store.py recover
+"""
+import argparse
+import atexit
+import json
+import logging
+import os
+import queue
+import secrets
+import sqlite3
+import threading
+import time
+
+DEFAULT_STORE_PATH = os.path.join(".cache", "sessions.sqlite3")  # For the CLI; the app stores nothing by default
+DEFAULT_RETENTION_DAYS = 30
+WRITE_BATCH_SIZE = 200  # Events per transaction, at most
+WRITE_MAX_ATTEMPTS = 5
+WRITE_RETRY_BASE_SECONDS = 0.2  # Doubles per attempt
+PURGE_INTERVAL_SECONDS = 60 * 60
+
+logger = logging.getLogger(__name__)
+
+EVENT_MESSAGE = "message"  # {"role", "content"}
+# {"session": {attr: value}, "candidate_info": {field: value}, "candidate_info_items": {field: {key: value}}},
+# where candidate_info_items carries only the new or changed entries of a dict field
+EVENT_STATE = "state"
+EVENT_REPORT = "report"  # {"key", "content"}; content None discards the report
+
+
+def new_resume_token():
+    return secrets.token_urlsafe(16)
+
+
+def replay_events(events):
+    # Folds a session's (kind, payload) events, oldest first, into its latest state
+    state = {"messages": [], "session": {}, "candidate_info": {}, "hiring_reports": {}}
+    for kind, payload in events:
+        if kind == EVENT_MESSAGE:
+            state["messages"].append(payload)
+        elif kind == EVENT_STATE:
+            state["session"].update(payload.get("session", {}))
+            state["candidate_info"].update(payload.get("candidate_info", {}))
+            for field, items in payload.get("candidate_info_items", {}).items():
+                state["candidate_info"].setdefault(field, {}).update(items)
+        elif kind == EVENT_REPORT:
+            if payload["content"] is None:
+                state["hiring_reports"].pop(payload["key"], None)
+            else:
+                state["hiring_reports"][payload["key"]] = payload["content"]
+    return state
+
+
+class SessionStore:
+    # Shared by every session in the process. append() only enqueues; the writer thread owns the write connection.
+
+    def __init__(self, path=DEFAULT_STORE_PATH, retention_days=DEFAULT_RETENTION_DAYS):
+        self.path = path
+        self.failed_path = f"{path}.failed.jsonl"
+        self.retention_days = retention_days
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "token TEXT PRIMARY KEY, created_at REAL NOT NULL, updated_at REAL NOT NULL, stage TEXT, "
+            "completed_at REAL);"
+            "CREATE TABLE IF NOT EXISTS events ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, token TEXT NOT NULL, created_at REAL NOT NULL, "
+            "kind TEXT NOT NULL, payload TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS events_token ON events (token, id);"
+        )
+        conn.close()
+
+        self._queue = queue.Queue()
+        self._purged_at = 0.0
+        threading.Thread(target=self._write_loop, name="session-store-writer", daemon=True).start()
+        atexit.register(self.flush)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA synchronous=NORMAL")  # Durable across app crashes in WAL mode; fsyncs on checkpoint
+        return conn
+
+    # --- Writes ---
+
+    def append(self, token, kind, payload, stage=None, completed=False):
+        # Serialized here, so later changes to payload by the caller don't leak into the stored event
+        self._queue.put((token, time.time(), kind, json.dumps(payload, ensure_ascii=False), stage, completed))
+
+    def flush(self):
+        # Blocks until every queued event is committed
+        self._queue.join()
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(conn, batch)
+                self._maybe_purge(conn)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_batch(self, conn, batch):
+        # Retries with backoff (a locked database usually clears up); a batch that still fails is written to
+        # failed_path for `python session_store.py recover`, so no event is lost
+        for attempt in range(1, WRITE_MAX_ATTEMPTS + 1):
+            try:
+                self._insert_events(conn, batch)
+                return
+            except sqlite3.Error as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                if attempt == WRITE_MAX_ATTEMPTS:
+                    logger.error("Writing %d session events failed after %d attempts: %s", len(batch), attempt, e)
+                    break
+                logger.warning("Writing %d session events failed (attempt %d), retrying: %s", len(batch), attempt, e)
+                time.sleep(WRITE_RETRY_BASE_SECONDS * 2 ** (attempt - 1))
+        try:
+            with open(self.failed_path, "a", encoding="utf-8") as f:
+                for event in batch:
+                    f.write(json.dumps(event, ensure_ascii=False) + "\n")
+            logger.error("Saved %d unwritten session events to %s", len(batch), self.failed_path)
+        except OSError as e:
+            logger.critical("Lost %d session events: couldn't write %s: %s", len(batch), self.failed_path, e)
+
+    def _insert_events(self, conn, batch):
+        conn.execute("BEGIN")
+        for token, created_at, kind, payload, stage, completed in batch:
+            conn.execute("INSERT OR IGNORE INTO sessions (token, created_at, updated_at) VALUES (?, ?, ?)",
+                         (token, created_at, created_at))
+            conn.execute("INSERT INTO events (token, created_at, kind, payload) VALUES (?, ?, ?, ?)",
+                         (token, created_at, kind, payload))
+            conn.execute("UPDATE sessions SET updated_at = ?, stage = COALESCE(?, stage), "
+                         "completed_at = CASE WHEN ? THEN ? ELSE completed_at END WHERE token = ?",
+                         (created_at, stage, completed, created_at, token))
+        conn.execute("COMMIT")
+
+    def _maybe_purge(self, conn):
+        if not self.retention_days or time.time() - self._purged_at < PURGE_INTERVAL_SECONDS:
+            return
+        self._purged_at = time.time()
+        try:
+            purged = self.purge(self.retention_days, conn)
+        except sqlite3.Error as e:
+            logger.warning("Purging expired sessions failed: %s", e)
+            return
+        if purged:
+            logger.info("Purged %d sessions older than %s days", purged, self.retention_days)
+
+    # --- Maintenance ---
+
+    def purge(self, older_than_days, conn=None):
+        # Deletes sessions (and their events) not updated in older_than_days; returns how many
+        cutoff = time.time() - older_than_days * 24 * 60 * 60
+        own_conn = conn is None
+        conn = conn or self._connect()
+        try:
+            conn.execute("BEGIN")
+            conn.execute("DELETE FROM events WHERE token IN (SELECT token FROM sessions WHERE updated_at < ?)",
+                         (cutoff,))
+            purged = conn.execute("DELETE FROM sessions WHERE updated_at < ?", (cutoff,)).rowcount
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            if own_conn:
+                conn.close()
+        return purged
+
+    def recover(self):
+        # Re-queues the events in failed_path; returns how many
+        if not os.path.exists(self.failed_path):
+            return 0
+        recovering_path = f"{self.failed_path}.recovering"
+        os.replace(self.failed_path, recovering_path)
+        with open(recovering_path, encoding="utf-8") as f:
+            events = [json.loads(line) for line in f if line.strip()]
+        for event in events:
+            self._queue.put(tuple(event))
+        self.flush()
+        os.remove(recovering_path)
+        return len(events)
+
+    # --- Reads ---
+
+    def load_events(self, token):
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT kind, payload FROM events WHERE token = ? ORDER BY id", (token,)).fetchall()
+        finally:
+            conn.close()
+        return [(kind, json.loads(payload)) for kind, payload in rows]
+
+    def load_state(self, token):
+        # None for an unknown token. Sees this process's queued events too.
+        self.flush()
+        events = self.load_events(token)
+        return replay_events(events) if events else None
+
+    def list_sessions(self, limit=50, completed_only=False):
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT token, created_at, updated_at, stage, completed_at FROM sessions "
+                f"{'WHERE completed_at IS NOT NULL ' if completed_only else ''}ORDER BY updated_at DESC LIMIT ?",
+                (limit,)).fetchall()
+        finally:
+            conn.close()
+        return [dict(zip(("token", "created_at", "updated_at", "stage", "completed_at"), row)) for row in rows]
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_session_store():
+    # One store per process, or None (sessions stay in memory) unless HIREBOT_SESSION_STORE_PATH is set
+    global _default_store
+    path = os.getenv("HIREBOT_SESSION_STORE_PATH", "")
+    if not path:
+        return None
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = SessionStore(
+                path=path, retention_days=float(os.getenv("HIREBOT_SESSION_RETENTION_DAYS", DEFAULT_RETENTION_DAYS)))
+        return _default_store
+
+
+# --- CLI ---
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect stored interview sessions.")
+    parser.add_argument("--path", default=os.getenv("HIREBOT_SESSION_STORE_PATH") or DEFAULT_STORE_PATH)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    list_parser = subparsers.add_parser("list", help="Most recently updated sessions first.")
+    list_parser.add_argument("--limit", type=int, default=50)
+    list_parser.add_argument("--completed", action="store_true", help="Only sessions with a hiring report.")
+    show_parser = subparsers.add_parser("show", help="Print a session's replayed state as JSON.")
+    show_parser.add_argument("token")
+    purge_parser = subparsers.add_parser("purge", help="Delete sessions not updated in the given number of days.")
+    purge_parser.add_argument("--days", type=float,
+                              default=float(os.getenv("HIREBOT_SESSION_RETENTION_DAYS", DEFAULT_RETENTION_DAYS)))
+    subparsers.add_parser("recover", help="Write events saved to PATH.failed.jsonl into the store.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    store = SessionStore(path=args.path, retention_days=0)
+    if args.command == "purge":
+        print(f"Purged {store.purge(args.days)} sessions.")
+        return
+    if args.command == "recover":
+        print(f"Recovered {store.recover()} events.")
+        return
+    if args.command == "list":
+        for session in store.list_sessions(args.limit, args.completed):
+            completed = time.strftime("%Y-%m-%d %H:%M", time.localtime(session["completed_at"])) \
+                if session["completed_at"] else "-"
+            print(f"{session['token']}  {time.strftime('%Y-%m-%d %H:%M', time.localtime(session['updated_at']))}  "
+                  f"{session['stage'] or '-':<28} completed: {completed}")
+    else:
+        state = store.load_state(args.token)
+        if state is None:
+            print(f"No session with token {args.token}")
+            return
+        print(json.dumps(state, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Single-flight execution: concurrent calls with the same key share one run and all receive its result."""
+import threading
+
+
+class _Flight:
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}  # key -> _Flight currently running
+        self._stats = {"calls": 0, "executions": 0, "coalesced": 0}
+
+    def do(self, key, fn):
+        # Returns (result, shared); shared is True when the result came from another caller's run.
+        # Only overlapping calls are merged: once a run finishes, the next call with its key runs again.
+        with self._lock:
+            self._stats["calls"] += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self._stats["executions"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = fn()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result, False
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, in_flight=len(self._flights))
+
+
+_default_single_flight = None
+_default_single_flight_lock = threading.Lock()
+
+
+def get_single_flight():
+    # Shared by every caller of gemini_client in the process
+    global _default_single_flight
+    with _default_single_flight_lock:
+        if _default_single_flight is None:
+            _default_single_flight = SingleFlight()
+        return _default_single_flight
@@ -0,0 +1,103 @@
+"""Cold-start profile: per-module import cost and lazy-resource initialization time.
+
+    python startup_profile.py [--top 15] [--json startup_profile.json]
+
+Each module is imported in a fresh interpreter with `-X importtime`, so the numbers are what the first
+Streamlit script run pays. Per-rerun overhead is shown in the app's sidebar when HIREBOT_PROFILE=1.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Third-party modules app.py imports, followed by the app's own modules
+PROFILED_MODULES = [
+    "streamlit", "streamlit_lottie", "requests", "dotenv", "nltk", "google.generativeai",
+    "response_cache", "gemini_client", "question_bank", "message_catalog", "sentiment", "asset_cache",
+    "interview_session", "conversation_context", "call_metrics", "session_store", "resume_ingest", "tech_dictionary",
+    "job_titles",
+]
+
+
+def profile_import(module):
+    # Returns (cumulative import time in ms, [(self ms, name), ...] for the slowest nested imports)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    if result.returncode != 0:
+        return None, []
+    total_us = 0
+    nested = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        nested.append((int(self_us) / 1000, name))
+        if name == module:
+            total_us = int(cumulative_us)
+    return total_us / 1000, sorted(nested, reverse=True)
+
+
+def profile_resources():
+    # Time to build each lazy singleton once its module is already imported
+    timings = {}
+
+    import sentiment
+    started = time.perf_counter()
+    sentiment.get_sentiment_analyzer()
+    timings["sentiment.get_sentiment_analyzer"] = (time.perf_counter() - started) * 1000
+
+    import gemini_client
+    started = time.perf_counter()
+    try:
+        gemini_client.get_model()  # No network call; builds the client from GOOGLE_API_KEY
+        timings["gemini_client.get_model"] = (time.perf_counter() - started) * 1000
+    except Exception as e:
+        print(f"Skipping gemini_client.get_model: {e}")
+
+    import message_catalog
+    import question_bank
+    for name, loader in (("question_bank.get_question_bank", question_bank.get_question_bank),
+                         ("message_catalog.get_message_catalog", message_catalog.get_message_catalog)):
+        started = time.perf_counter()
+        loader()
+        timings[name] = (time.perf_counter() - started) * 1000
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure import-time and lazy-initialization cost.")
+    parser.add_argument("--top", type=int, default=10, help="Slowest nested imports to list per module.")
+    parser.add_argument("--json", help="Also write the results to this file.")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    report = {"imports": {}, "resources": {}}
+    print("Import cost (fresh interpreter, cumulative):")
+    for module in PROFILED_MODULES:
+        total_ms, nested = profile_import(module)
+        if total_ms is None:
+            print(f"  {module:<24} not importable")
+            continue
+        report["imports"][module] = {"cumulative_ms": round(total_ms, 1),
+                                     "slowest": [{"module": name, "self_ms": round(ms, 1)}
+                                                 for ms, name in nested[:args.top]]}
+        print(f"  {module:<24} {total_ms:8.1f} ms")
+        for ms, name in nested[:args.top]:
+            print(f"      {ms:8.1f} ms  {name}")
+
+    print("Lazy resource initialization:")
+    for name, ms in profile_resources().items():
+        report["resources"][name] = round(ms, 1)
+        print(f"  {name:<40} {ms:8.1f} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""Local technology dictionary: canonical names, their aliases and a token-trie matcher.
+
+Canonical names are the question bank's tech names (question_bank.COMMON_TECHS and then some), so extracted
+techs map straight onto bank keys through question_bank.normalize_tech. Matching walks a trie of alias token
+sequences (longest match wins) and also recognises version-suffixed spellings such as "Python3" or "Java 17".
+Anything it can't classify is returned as leftover terms, for the caller to hand to the model.
+"""
+import re
+import threading
+
+from question_bank import COMMON_TECHS, normalize_tech
+
+# Canonical name -> other spellings of the same technology (the canonical name itself is always an alias). Related
+# but distinct tools (Helm for Kubernetes, Nuxt for Vue) get an entry of their own or none at all, never an alias.
+# Matching is case-insensitive and ignores version suffixes, so "python3", "Python 3.12" or "HTML5" need no entry.
+TECH_ALIASES = {
+    "Python": ["py", "cpython"],
+    "Java": ["jdk", "core java", "java se", "java ee", "j2ee", "jakarta ee"],
+    "JavaScript": ["js", "ecmascript", "es6", "es2015", "vanilla js", "vanilla javascript"],
+    "TypeScript": ["ts"],
+    "C++": ["cpp", "c plus plus", "cplusplus"],
+    "C#": ["csharp", "c sharp"],
+    "Go": ["golang"],
+    "Rust": ["rustlang"],
+    "Kotlin": [],
+    "Swift": [],
+    "PHP": [],
+    "Ruby": [],
+    "SQL": ["t-sql", "tsql", "pl/sql", "plsql", "ansi sql"],
+    "React": ["reactjs", "react.js", "react js", "react hooks"],
+    "Angular": ["angularjs", "angular.js", "angular js"],
+    "Vue.js": ["vue", "vuejs", "vue js"],
+    "Node.js": ["node", "nodejs", "node js"],
+    "Django": [],
+    "Flask": [],
+    "FastAPI": ["fast api"],
+    "Spring Boot": ["springboot"],
+    ".NET": ["dotnet", "dot net", ".net core", "net core"],
+    "HTML": [],
+    "CSS": [],
+    "AWS": ["amazon web services"],
+    "Azure": ["microsoft azure", "ms azure"],
+    "Google Cloud": ["gcp", "google cloud platform"],
+    "Docker": ["dockerfile"],
+    "Kubernetes": ["k8s", "kube"],
+    "Terraform": [],
+    "Git": [],
+    "Linux": [],
+    "PostgreSQL": ["postgres", "postgresql", "psql", "pg"],
+    "MySQL": [],
+    "MongoDB": ["mongo"],
+    "Redis": [],
+    "Kafka": ["apache kafka"],
+    "Spark": ["apache spark", "pyspark"],
+    "Pandas": [],
+    "TensorFlow": ["tf", "tensor flow", "tf2"],
+    "PyTorch": ["torch", "py torch"],
+    "Machine Learning": ["ml", "machinelearning"],
+    "Data Structures": ["data structures and algorithms", "dsa", "data structure"],
+    "System Design": ["systems design", "hld", "lld"],
+    # Beyond the bank's common set
+    "C": ["ansi c"],
+    "R": ["rlang", "r language"],
+    "Scala": [],
+    "Dart": [],
+    "Flutter": [],
+    "React Native": ["react-native"],
+    "Android": ["android sdk"],
+    "iOS": ["ios development"],
+    "Objective-C": ["objective c", "objc"],
+    "Perl": [],
+    "Bash": ["shell", "shell scripting", "sh"],
+    "PowerShell": ["power shell"],
+    "MATLAB": [],
+    "Haskell": [],
+    "Elixir": [],
+    "Lua": [],
+    "Solidity": [],
+    "GraphQL": ["graph ql"],
+    "REST": ["rest api", "rest apis", "restful", "restful api", "restful apis"],
+    "Next.js": ["nextjs", "next js", "next"],
+    "Express": ["express.js", "expressjs", "express js"],
+    "NestJS": ["nest.js", "nest js"],
+    "Svelte": [],
+    "jQuery": [],
+    "Redux": ["redux toolkit"],
+    "Tailwind CSS": ["tailwind", "tailwindcss"],
+    "Bootstrap": [],
+    "Laravel": [],
+    "Ruby on Rails": ["rails", "ror"],
+    "Spring": ["spring framework"],
+    "Hibernate": [],
+    "Microservices": ["microservice", "micro services"],
+    "CI/CD": ["ci", "cd", "cicd", "continuous integration", "continuous delivery", "continuous deployment"],
+    "Jenkins": [],
+    "GitHub": [],
+    "GitLab": [],
+    "GitHub Actions": ["gh actions"],
+    "Ansible": [],
+    "Helm": [],
+    "Nginx": [],
+    "Elasticsearch": ["elastic search"],
+    "SQLite": ["sqlite3"],
+    "Oracle": ["oracle db", "oracle database"],
+    "SQL Server": ["mssql", "ms sql", "ms-sql", "ms sql server", "mssql server", "microsoft sql",
+                   "microsoft sql server"],
+    "DynamoDB": ["dynamo db", "dynamo"],
+    "Cassandra": ["apache cassandra"],
+    "Firebase": [],
+    "RabbitMQ": ["rabbit mq"],
+    "Hadoop": ["apache hadoop", "hdfs"],
+    "Hive": ["apache hive"],
+    "Airflow": ["apache airflow"],
+    "Snowflake": [],
+    "BigQuery": ["big query"],
+    "dbt": ["data build tool"],
+    "Tableau": [],
+    "Power BI": ["powerbi"],
+    "Excel": ["ms excel", "microsoft excel"],
+    "NumPy": ["numpy"],
+    "Keras": [],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "Deep Learning": ["dl", "neural networks", "neural network"],
+    "NLP": ["natural language processing"],
+    "Computer Vision": ["cv"],
+    "LLMs": ["llm", "large language models", "large language model"],
+    "Selenium": [],
+    "Cypress": [],
+    "Jest": [],
+    "Pytest": ["py.test"],
+    "JUnit": ["junit5"],
+    "Unity": ["unity3d"],
+    "Figma": [],
+    "Jira": [],
+    "Agile": [],
+}
+
+# Words that carry no technology by themselves ("3 years of experience with ...")
+NOISE_WORDS = frozenset("""
+    a about also am an and any are as at basic basics be beginner both but by can daily development developer do
+    etc everyday experience experienced expert expertise familiar familiarity for from frameworks framework good
+    have having i i'm im in intermediate including is it knowledge know languages language libraries library like
+    mainly me mostly my of on or other others plus proficient proficiency programming skills skill some stack
+    strong such tech technologies technology the to tools tool use used using very with work worked working
+    year years yrs yr advanced advance exposure hands-on handson projects project level well
+""".split())
+
+# Spellings that are also ordinary words or abbreviations ("go", "react to", "CV"). In a tech-stack field they
+# are taken at face value; in prose (a resume) only within a list item that holds nothing else unknown.
+AMBIGUOUS_SPELLINGS = frozenset([
+    "go", "next", "spring", "express", "react", "swift", "rust", "dart", "unity", "excel", "oracle", "shell",
+    "sh", "c", "r", "cv", "cd", "ci", "dl", "ml", "ts", "tf", "pg", "rest", "node", "dynamo", "rails", "helm",
+    "hive", "jest", "bootstrap", "agile", "spark", "llm", "lld", "hld", "kube",
+])
+
+TOKEN_PATTERN = re.compile(r"[^\s,;|()\[\]{}<>\"'`]+")
+SEPARATOR_PATTERN = re.compile(r"[,;|()\[\]{}<>\n]")
+VERSION_PATTERN = re.compile(r"^v?\d+(\.\d+)*(\.x|\+)?$")
+VERSION_SUFFIX_PATTERN = re.compile(r"(?<=[a-z+#])[-_ ]?v?\d+(\.\d+)*$")
+_END = "\0"  # Trie key marking the end of an alias; maps to the canonical name
+
+
+def _tokens(text):
+    # (raw token as written, lower-cased token with sentence punctuation stripped); keeps the symbols technology
+    # names use (c++, .net)
+    for raw in TOKEN_PATTERN.findall(text):
+        lowered = raw.lower()
+        token = lowered.strip(".:!?*").rstrip("-") if not lowered.startswith(".") else lowered.rstrip(".:!?*")
+        if token:
+            yield raw, token
+
+
+def _token_variants(token):
+    yield token
+    stripped = VERSION_SUFFIX_PATTERN.sub("", token)
+    if stripped and stripped != token:
+        yield stripped  # "python3" -> "python", "vue3" -> "vue"
+
+
+class TechMatcher:
+    # Built once per process from TECH_ALIASES; match() and canonical() are read-only, so it is thread-safe
+
+    def __init__(self, aliases=None):
+        self._trie = {}
+        aliases = dict(aliases or TECH_ALIASES)
+        for tech in COMMON_TECHS:
+            aliases.setdefault(tech, [])  # Every question-bank tech is recognised under its own name
+        for canonical, spellings in aliases.items():
+            for spelling in [canonical] + list(spellings):
+                node = self._trie
+                tokens = [token for _, token in _tokens(spelling)]
+                for token in tokens:
+                    node = node.setdefault(token, {})
+                node[_END] = (canonical, " ".join(tokens) in AMBIGUOUS_SPELLINGS)
+
+    def _longest_match(self, tokens, start):
+        # (end index, (canonical name, ambiguous)) of the longest alias starting at tokens[start], or None
+        node, best = self._trie, None
+        for index in range(start, len(tokens)):
+            for variant in _token_variants(tokens[index]):
+                if variant in node:
+                    node = node[variant]
+                    break
+            else:
+                break
+            if _END in node:
+                best = (index + 1, node[_END])
+        return best
+
+    def match(self, text, prose=False):
+        # Returns (canonical techs in order of first mention, leftover terms the dictionary couldn't classify).
+        # Leftovers are runs of unknown words between separators, known techs and filler words. prose=True is
+        # for free text such as a resume: see AMBIGUOUS_SPELLINGS.
+        techs, leftovers = {}, []
+        for segment in SEPARATOR_PATTERN.split(text or ""):
+            raw_tokens, tokens = [], []
+            for raw, token in _tokens(segment):
+                raw_tokens.append(raw)
+                tokens.append(token)
+            matches, segment_leftovers, unknown = [], [], []
+            index = 0
+            while index < len(tokens):
+                found = self._longest_match(tokens, index)
+                if found is None and "/" in tokens[index]:
+                    # "React/Redux": match the parts on their own
+                    part_techs, part_leftovers = self.match(tokens[index].replace("/", ","), prose)
+                    if part_techs and not part_leftovers:
+                        matches.extend((tech, False) for tech in part_techs)
+                        found = (index + 1, None)
+                if found is not None:
+                    end, matched = found
+                    if matched is not None:
+                        matches.append(matched)
+                    if unknown:
+                        segment_leftovers.append(" ".join(unknown))
+                        unknown = []
+                    index = end
+                    continue
+                token = tokens[index]
+                if token in NOISE_WORDS or VERSION_PATTERN.match(token) or not any(c.isalnum() for c in token):
+                    if unknown:
+                        segment_leftovers.append(" ".join(unknown))
+                        unknown = []
+                else:
+                    unknown.append(raw_tokens[index].strip(".:!?*"))
+                index += 1
+            if unknown:
+                segment_leftovers.append(" ".join(unknown))
+
+            for canonical, ambiguous in matches:
+                if not (prose and ambiguous and segment_leftovers):
+                    techs.setdefault(canonical)
+            leftovers.extend(segment_leftovers)
+        return list(techs), list(dict.fromkeys(leftovers))
+
+    def canonical(self, name):
+        # The canonical name when all of `name` is one known technology, else None; version numbers are ignored
+        # ("Python 3", "Java SE 17")
+        tokens = [token for _, token in _tokens(name or "") if not VERSION_PATTERN.match(token)]
+        found = self._longest_match(tokens, 0) if tokens else None
+        if found is not None and found[0] == len(tokens):
+            return found[1][0]
+        return None
+
+
+def dedupe_techs(techs):
+    # Keeps the first spelling of each technology, compared the way the question bank keys them
+    unique = {}
+    for tech in techs:
+        unique.setdefault(normalize_tech(tech), tech)
+    return list(unique.values())
+
+
+_default_matcher = None
+_default_matcher_lock = threading.Lock()
+
+
+def get_tech_matcher():
+    global _default_matcher
+    with _default_matcher_lock:
+        if _default_matcher is None:
+            _default_matcher = TechMatcher()
+        return _default_matcher